@@ -0,0 +1,313 @@
+# ==============================================================================
+# COPYRIGHT NOTICE & LICENSE TERMS
+# ==============================================================================
+#  Software: QUANTIX Inventory System
+#  Owner:    Wildfire Consulting Services LLC
+#  Author:   Joao de Mendonca Salim
+#  Copyright (c) 2026 Wildfire Consulting Services LLC. All Rights Reserved.
+#
+#  LICENSE TERMS:
+#  This software is provided under a revocable, non-exclusive, non-transferable
+#  free license granted by Wildfire Consulting Services LLC.
+# ==============================================================================
+"""Headless HTTP API for stock movements, for POS terminals and web shops.
+
+Runs next to inventory_app.py on the same inventory.csv / history.csv and
+applies movements with the same rules (inventory_store.apply_movements).
+
+    python api_server.py [--root DIR] [--tenant ID] [--host 127.0.0.1] [--port 8502]
+    python api_server.py --bench 5000 [--clients 8] [--batch 1]
+
+    GET  /health
+    GET  /products/<product_id>
+    GET  /low-stock
+    POST /movements          {"product_id": "...", "action": "SALE", "qty": 1}
+    POST /movements/batch    {"movements": [{"product_id": ..., "action": ..., "qty": ...}, ...]}
+
+POSTs may send an `Idempotency-Key` header: a retried key gets the original
+response back without applying the movements again; the same key with a
+different path or body is refused with 422. Keys expire after 48 h. If config.json has an
+"api_token", requests must send `Authorization: Bearer <token>`.
+
+Concurrent requests are group-committed: whatever arrives while a write is in
+progress is applied together in the next single read-modify-write.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import inventory_store
+import tenants
+
+IDEMPOTENCY_FILE = 'idempotency.jsonl'
+IDEMPOTENCY_TTL = 48 * 3600
+IDEMPOTENCY_COMPACT_EVERY = 600  # seconds between dropping expired keys from memory and the file
+MAX_QTY = 100000
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class IdempotencyStore:
+    """Responses by Idempotency-Key, persisted as JSON lines so retries survive restarts.
+
+    Each key also stores a hash of the request it answered (fingerprint()), so
+    reusing a key for a different request is detected instead of replayed.
+    """
+
+    def __init__(self, path, ttl=IDEMPOTENCY_TTL):
+        self.path, self.ttl = path, ttl
+        self._done, self._pending = {}, {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try: rec = json.loads(line)
+                    except ValueError: continue
+                    self._done[rec['key']] = rec
+        self._expire()
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        self._done = {k: rec for k, rec in self._done.items() if rec['ts'] >= cutoff}
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for rec in self._done.values(): f.write(json.dumps(rec) + '\n')
+        os.replace(tmp, self.path)
+        self._compacted = time.monotonic()
+
+    @staticmethod
+    def fingerprint(path, raw):
+        return hashlib.sha256(path.encode() + b'\n' + raw).hexdigest()
+
+    def begin(self, key, fingerprint):
+        """Return a stored (status, body) for `key`, or None after reserving it for this caller.
+
+        A key already used for another request gives (422, error).
+        """
+        while True:
+            with self._lock:
+                rec = self._done.get(key)
+                if rec is not None:
+                    if rec.get('fp', fingerprint) != fingerprint: return 422, {'error': "Idempotency-Key already used for a different request"}
+                    return rec['status'], rec['body']
+                waiter = self._pending.get(key)
+                if waiter is None:
+                    self._pending[key] = threading.Event(); return None
+            waiter.wait()
+
+    def finish(self, key, fingerprint, status, body):
+        with self._lock:
+            if status < 500:
+                rec = self._done[key] = {'key': key, 'fp': fingerprint, 'ts': time.time(), 'status': status, 'body': body}
+                with open(self.path, 'a', encoding='utf-8') as f: f.write(json.dumps(rec) + '\n')
+            self._pending.pop(key).set()
+            if time.monotonic() - self._compacted >= IDEMPOTENCY_COMPACT_EVERY: self._expire()
+
+
+class GroupCommitter:
+    """Serializes movement batches through one writer thread, merging whatever is queued."""
+
+    def __init__(self, data_file, history_file):
+        self.data_file, self.history_file = data_file, history_file
+        self._queue = []
+        self._cond = threading.Condition()
+        threading.Thread(target=self._run, name="group-commit", daemon=True).start()
+
+    def apply(self, movements):
+        job = {'movements': movements, 'done': threading.Event()}
+        with self._cond:
+            self._queue.append(job); self._cond.notify()
+        job['done'].wait()
+        if 'error' in job: raise job['error']
+        return job['results']
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue: self._cond.wait()
+                jobs, self._queue = self._queue, []
+            try:
+                results = inventory_store.apply_movements(self.data_file, self.history_file, [m for job in jobs for m in job['movements']])
+                i = 0
+                for job in jobs:
+                    n = len(job['movements']); job['results'] = results[i:i + n]; i += n
+            except Exception as e:
+                for job in jobs: job['error'] = e
+            for job in jobs: job['done'].set()
+
+
+def _parse_movement(m):
+    if not isinstance(m, dict): raise ApiError(400, "movement must be an object")
+    pid, action, qty = m.get('product_id'), str(m.get('action', '')).upper(), m.get('qty', 1)
+    if pid in (None, ''): raise ApiError(400, "product_id is required")
+    if action not in inventory_store.ACTION_SIGN: raise ApiError(400, f"action must be one of {sorted(inventory_store.ACTION_SIGN)}")
+    if isinstance(qty, bool) or not isinstance(qty, int) or not 0 < qty <= MAX_QTY: raise ApiError(400, f"qty must be an integer between 1 and {MAX_QTY}")
+    return str(pid), action, qty
+
+
+class Api:
+    def __init__(self, root):
+        self.root = root
+        self.data_file = os.path.join(root, 'inventory.csv')
+        self.history_file = os.path.join(root, 'history.csv')
+        self.committer = GroupCommitter(self.data_file, self.history_file)
+        self.idempotency = IdempotencyStore(os.path.join(root, IDEMPOTENCY_FILE))
+        self.token = None
+        try:
+            with open(os.path.join(root, 'config.json'), 'r') as f: self.token = json.load(f).get('api_token')
+        except (OSError, ValueError): pass
+
+    def _product(self, row):
+        return {'product_id': row['product_id'], 'product_name': row['product_name'], 'quantity': int(row['quantity']), 'min_stock': int(row['min_stock']), 'sell_price': float(row['sell_price'])}
+
+    def get(self, path):
+        if path == '/health': return 200, {'status': 'ok'}
+        if path == '/low-stock':
+            return 200, {'products': [self._product(r) for _, r in inventory_store.low_stock(self.data_file).iterrows()]}
+        if path.startswith('/products/'):
+            pid = urllib.parse.unquote(path[len('/products/'):])
+            df = inventory_store.read_inventory(self.data_file)
+            match = df[df['product_id'] == pid]
+            if match.empty: raise ApiError(404, "product not found")
+            return 200, self._product(match.iloc[0])
+        raise ApiError(404, "not found")
+
+    def post(self, path, body):
+        if path == '/movements':
+            res = self.committer.apply([_parse_movement(body)])[0]
+            if res is None: raise ApiError(404, "product not found")
+            return 200, res
+        if path == '/movements/batch':
+            items = body.get('movements') if isinstance(body, dict) else None
+            if not isinstance(items, list) or not items: raise ApiError(400, "movements must be a non-empty list")
+            moves = [_parse_movement(m) for m in items]
+            results = self.committer.apply(moves)
+            return 200, {'results': [r if r is not None else {'product_id': m[0], 'error': 'product not found'} for m, r in zip(moves, results)]}
+        raise ApiError(404, "not found")
+
+
+def make_handler(api, quiet=False):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True  # headers and body go out as separate writes on keep-alive connections
+
+        def log_message(self, fmt, *args):
+            if not quiet: super().log_message(fmt, *args)
+
+        def _send(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _authorized(self):
+            return not api.token or self.headers.get('Authorization') == f"Bearer {api.token}"
+
+        def do_GET(self):
+            if not self._authorized(): return self._send(401, {'error': "unauthorized"})
+            try: self._send(*api.get(urllib.parse.urlsplit(self.path).path))
+            except ApiError as e: self._send(e.status, {'error': str(e)})
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            raw = self.rfile.read(length)
+            if not self._authorized(): return self._send(401, {'error': "unauthorized"})
+            key, path = self.headers.get('Idempotency-Key'), urllib.parse.urlsplit(self.path).path
+            if key:
+                fp = api.idempotency.fingerprint(path, raw)
+                stored = api.idempotency.begin(key, fp)
+                if stored is not None: return self._send(*stored)
+            try:
+                status, body = api.post(path, json.loads(raw or b'{}'))
+            except ApiError as e: status, body = e.status, {'error': str(e)}
+            except ValueError: status, body = 400, {'error': "invalid JSON"}
+            except Exception as e: status, body = 500, {'error': str(e)}
+            if key: api.idempotency.finish(key, fp, status, body)
+            self._send(status, body)
+
+    return Handler
+
+
+def serve(root, host='127.0.0.1', port=8502, quiet=False):
+    server = ThreadingHTTPServer((host, port), make_handler(Api(root), quiet))
+    server.daemon_threads = True
+    return server
+
+
+# --- BENCHMARK ---
+def bench(total, clients, batch, source_root):
+    """Sustained movements/s against a throwaway copy of the catalog."""
+    import http.client
+    import random
+    tmp = tempfile.mkdtemp(prefix="quantix_bench_")
+    try:
+        shutil.copy(os.path.join(source_root, 'inventory.csv'), tmp)
+        ids = inventory_store.read_inventory(os.path.join(tmp, 'inventory.csv'))['product_id'].tolist()
+        server = serve(tmp, port=0, quiet=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_address[1]
+        per_client = total // clients // batch
+        latencies, lock = [], threading.Lock()
+
+        def client(n):
+            conn = http.client.HTTPConnection('127.0.0.1', port)
+            rnd = random.Random(n); mine = []
+            for i in range(per_client):
+                moves = [{'product_id': rnd.choice(ids), 'action': 'ADD', 'qty': 1} for _ in range(batch)]
+                body = json.dumps({'movements': moves} if batch > 1 else moves[0])
+                t0 = time.perf_counter()
+                conn.request('POST', '/movements/batch' if batch > 1 else '/movements', body, {'Content-Type': 'application/json', 'Idempotency-Key': f"bench-{n}-{i}"})
+                resp = conn.getresponse(); resp.read()
+                mine.append(time.perf_counter() - t0)
+                if resp.status != 200: raise RuntimeError(f"HTTP {resp.status}")
+            with lock: latencies.extend(mine)
+
+        before = inventory_store.read_inventory(os.path.join(tmp, 'inventory.csv'))['quantity'].sum()
+        start = time.perf_counter()
+        threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+        for th in threads: th.start()
+        for th in threads: th.join()
+        elapsed = time.perf_counter() - start
+        server.shutdown()
+        after = inventory_store.read_inventory(os.path.join(tmp, 'inventory.csv'))['quantity'].sum()
+        done = len(latencies) * batch
+        latencies.sort()
+        print(f"{done} movements in {elapsed:.2f}s from {clients} clients (batch={batch}): {done / elapsed:,.0f} movements/s")
+        print(f"request latency p50={latencies[len(latencies) // 2] * 1000:.1f}ms p99={latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms")
+        print(f"stock delta {after - before} (expected {done})")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="QUANTIX stock API")
+    parser.add_argument('--root', default=os.path.dirname(os.path.abspath(__file__)), help="folder with inventory.csv / history.csv")
+    parser.add_argument('--tenant', default='', help="serve tenants/<id> under --root instead of --root itself")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--bench', type=int, metavar='N', help="benchmark N movements against a temporary copy and exit")
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--batch', type=int, default=1)
+    args = parser.parse_args()
+    args.root = os.path.join(args.root, tenants.root(args.tenant.strip().lower()))
+    if args.bench:
+        bench(args.bench, args.clients, args.batch, args.root); sys.exit(0)
+    httpd = serve(args.root, args.host, args.port)
+    print(f"QUANTIX API on http://{args.host}:{args.port} (data: {args.root})")
+    try: httpd.serve_forever()
+    except KeyboardInterrupt: pass
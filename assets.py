@@ -0,0 +1,154 @@
+# ==============================================================================
+# COPYRIGHT NOTICE & LICENSE TERMS
+# ==============================================================================
+#  Software: QUANTIX Inventory System
+#  Owner:    Wildfire Consulting Services LLC
+#  Author:   Joao de Mendonca Salim
+#  Copyright (c) 2026 Wildfire Consulting Services LLC. All Rights Reserved.
+#
+#  LICENSE TERMS:
+#  This software is provided under a revocable, non-exclusive, non-transferable
+#  free license granted by Wildfire Consulting Services LLC.
+# ==============================================================================
+"""On-demand QR / Code128 rendering with a bounded memory + disk LRU.
+
+QR codes and barcodes are pure functions of the product_id, so they are
+rendered when asked for instead of being stored next to the inventory.
+Results are keyed by (id, symbology, format, params); data: URIs for the
+catalog table are memoized next to the bytes they encode.
+"""
+
+import base64
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import barcode
+import qrcode
+import qrcode.image.svg
+from barcode.writer import ImageWriter, SVGWriter
+
+MIME = {'png': 'image/png', 'jpeg': 'image/jpeg', 'svg': 'image/svg+xml'}
+
+
+def render(code, symbology='qr', fmt='png', **params):
+    """Render `code` as bytes. params: QR -> box_size, border; Code128 -> python-barcode writer options."""
+    fmt = fmt.lower()
+    if fmt not in MIME: raise ValueError(f"Unsupported format: {fmt}")
+    buf = io.BytesIO()
+    if symbology == 'qr':
+        qr = qrcode.QRCode(box_size=params.get('box_size', 10), border=params.get('border', 4))
+        qr.add_data(code); qr.make(fit=True)
+        if fmt == 'svg': qr.make_image(image_factory=qrcode.image.svg.SvgPathImage).save(buf)
+        else: qr.make_image().get_image().convert("RGB").save(buf, format=fmt.upper())
+    elif symbology == 'code128':
+        writer = SVGWriter() if fmt == 'svg' else ImageWriter(format=fmt.upper())
+        barcode.get('code128', code, writer=writer).write(buf, params or None)
+    else:
+        raise ValueError(f"Unsupported symbology: {symbology}")
+    return buf.getvalue()
+
+
+class AssetCache:
+    """render() memoized in a bounded in-memory LRU backed by a bounded on-disk LRU."""
+
+    def __init__(self, folder, mem_max_bytes=32 * 1024 * 1024, disk_max_bytes=256 * 1024 * 1024):
+        self.folder = folder
+        self.mem_max_bytes = mem_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self._mem = OrderedDict()
+        self._mem_bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+        self._disk_bytes = sum(size for _, size, _ in self._disk_files())  # kept up to date on writes; rescanned only to trim
+
+    @staticmethod
+    def _code_prefix(code): return hashlib.sha1(str(code).encode()).hexdigest()[:12]
+
+    @classmethod
+    def key(cls, code, symbology, fmt, params):
+        """Starts with a hash of the code alone, so forget() finds every variant of one product."""
+        raw = json.dumps([str(code), symbology, fmt.lower(), sorted(params.items())], default=str)
+        return f"{cls._code_prefix(code)}-{hashlib.sha1(raw.encode()).hexdigest()}"
+
+    def _disk_path(self, key, fmt): return os.path.join(self.folder, f"{key}.{fmt.lower()}")
+
+    def get(self, code, symbology='qr', fmt='png', **params):
+        key = self.key(code, symbology, fmt, params)
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                return self._mem[key]
+        path = self._disk_path(key, fmt)
+        try:
+            with open(path, 'rb') as f: data = f.read()
+            os.utime(path)  # LRU order on disk is by mtime
+        except OSError:
+            data = render(code, symbology, fmt, **params)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, 'wb') as f: f.write(data)
+            os.replace(tmp, path)
+            with self._lock:
+                self._disk_bytes += len(data); over = self._disk_bytes > self.disk_max_bytes
+            if over: self._trim_disk()
+        self._remember(key, data)
+        return data
+
+    def data_uri(self, code, symbology='qr', fmt='png', **params):
+        if code is None or str(code) in ('', 'nan'): return None
+        key = self.key(code, symbology, fmt, params) + '.uri'
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                return self._mem[key]
+        uri = f"data:{MIME[fmt.lower()]};base64,{base64.b64encode(self.get(code, symbology, fmt, **params)).decode()}"
+        self._remember(key, uri)
+        return uri
+
+    def _remember(self, key, data):
+        with self._lock:
+            if key in self._mem: return
+            self._mem[key] = data; self._mem_bytes += len(data)
+            while self._mem_bytes > self.mem_max_bytes and len(self._mem) > 1:
+                _, old = self._mem.popitem(last=False); self._mem_bytes -= len(old)
+
+    def _disk_files(self):
+        files = []
+        for name in os.listdir(self.folder):
+            try:
+                info = os.stat(os.path.join(self.folder, name)); files.append((info.st_mtime, info.st_size, name))
+            except OSError: pass
+        return files
+
+    def _trim_disk(self):
+        """Remove the least recently used files down to 90% of the limit, so the next trim is many inserts away."""
+        files = self._disk_files()
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.disk_max_bytes * 0.9: break
+            try: os.remove(os.path.join(self.folder, name)); total -= size
+            except OSError: pass
+        with self._lock: self._disk_bytes = total
+
+    def forget(self, code):
+        """Drop every cached variant of `code` (bytes and data: URIs, memory and disk)."""
+        prefix = self._code_prefix(code) + '-'
+        with self._lock:
+            for key in [k for k in self._mem if k.startswith(prefix)]: self._mem_bytes -= len(self._mem.pop(key))
+        for name in os.listdir(self.folder):
+            if name.startswith(prefix):
+                path = os.path.join(self.folder, name)
+                try:
+                    size = os.path.getsize(path); os.remove(path)
+                    with self._lock: self._disk_bytes -= size
+                except OSError: pass
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear(); self._mem_bytes = 0; self._disk_bytes = 0
+        for name in os.listdir(self.folder):
+            try: os.remove(os.path.join(self.folder, name))
+            except OSError: pass
@@ -0,0 +1,174 @@
+# ==============================================================================
+# COPYRIGHT NOTICE & LICENSE TERMS
+# ==============================================================================
+#  Software: QUANTIX Inventory System
+#  Owner:    Wildfire Consulting Services LLC
+#  Author:   Joao de Mendonca Salim
+#  Copyright (c) 2026 Wildfire Consulting Services LLC. All Rights Reserved.
+#
+#  LICENSE TERMS:
+#  This software is provided under a revocable, non-exclusive, non-transferable
+#  free license granted by Wildfire Consulting Services LLC.
+# ==============================================================================
+"""QR decoding for all camera sessions on a shared process pool.
+
+Frames are copied into preallocated shared-memory slots and only the slot name
+and shape cross the process boundary, so full frames are never pickled. Each
+session keeps a small drop-oldest queue and at most one frame in flight; a
+dispatcher thread feeds free slots round-robin across sessions, so decoding
+scales with cores while the Streamlit server threads stay responsive.
+Sessions nobody has submitted to or read from for SESSION_IDLE seconds
+(stream stopped, tab closed) are dropped.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+SESSION_IDLE = 600  # seconds
+_detector = None
+
+
+def _attach(name):
+    """Open an existing slot; the parent owns it, so it must not be unlinked from here."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13: workers share the parent's resource tracker
+        return shared_memory.SharedMemory(name=name)
+
+
+def _decode_slot(name, shape):
+    """Worker side: decode the frame held in shared-memory slot `name`."""
+    global _detector
+    import cv2
+    if _detector is None: _detector = cv2.QRCodeDetector()
+    shm = _attach(name)
+    try:
+        img = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        data, _, _ = _detector.detectAndDecode(img)
+        del img
+        return data
+    finally:
+        shm.close()
+
+
+class _Session:
+    def __init__(self, queue_size):
+        self.queue = deque(maxlen=queue_size)
+        self.busy = False
+        self.seen = time.monotonic()
+        self.last_code, self.last_code_at = "", 0.0
+        self.stats = {'submitted': 0, 'dropped': 0, 'decoded': 0, 'hits': 0, 'avg_ms': 0.0}
+
+
+class DecodeService:
+    def __init__(self, workers=None, queue_size=2, slot_bytes=1280 * 720 * 3):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.queue_size = queue_size
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        self._slots = [shared_memory.SharedMemory(create=True, size=slot_bytes) for _ in range(self.workers * 2)]
+        self._free = list(range(len(self._slots)))
+        self._sessions = {}
+        self._order = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._swept = time.monotonic()
+        threading.Thread(target=self._dispatch, name="decode-dispatch", daemon=True).start()
+        atexit.register(self.close)
+
+    def submit(self, session_id, frame):
+        """Queue a BGR frame for `session_id`; the oldest queued frame is dropped when full."""
+        with self._cond:
+            self._expire()
+            s = self._sessions.get(session_id)
+            if s is None:
+                s = self._sessions[session_id] = _Session(self.queue_size); self._order.append(session_id)
+            s.seen = time.monotonic()
+            if len(s.queue) == s.queue.maxlen: s.stats['dropped'] += 1
+            s.queue.append((np.array(frame, dtype=np.uint8, order='C'), time.perf_counter()))  # own copy: callers may draw on theirs
+            s.stats['submitted'] += 1
+            self._cond.notify()
+
+    def last_code(self, session_id, max_age=None):
+        with self._cond:
+            s = self._sessions.get(session_id)
+            if s is not None: s.seen = time.monotonic()
+            if s is None or not s.last_code: return ""
+            if max_age is not None and time.time() - s.last_code_at > max_age: return ""
+            return s.last_code
+
+    def stats(self, session_id=None):
+        with self._cond:
+            if session_id is not None:
+                s = self._sessions.get(session_id)
+                return dict(s.stats, queued=len(s.queue)) if s else {}
+            return {sid: dict(s.stats, queued=len(s.queue)) for sid, s in self._sessions.items()}
+
+    def drop_session(self, session_id):
+        with self._cond:
+            if self._sessions.pop(session_id, None) is not None: self._order.remove(session_id)
+
+    def _expire(self):
+        """Drop idle sessions; called with the lock held, at most once a minute."""
+        now = time.monotonic()
+        if now - self._swept < 60: return
+        self._swept = now
+        for sid in [sid for sid, s in self._sessions.items() if now - s.seen > SESSION_IDLE]:
+            del self._sessions[sid]; self._order.remove(sid)
+
+    def _next_job(self):
+        for _ in range(len(self._order)):
+            sid = self._order[0]; self._order.rotate(-1)
+            s = self._sessions[sid]
+            if s.queue and not s.busy: return sid, s
+        return None, None
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    sid, s = self._next_job() if self._free else (None, None)
+                    if s is not None: break
+                    self._cond.wait()
+                if self._closed: return
+                frame, queued_at = s.queue.popleft()
+                s.busy = True
+                idx = self._free.pop()
+                if self._slots[idx].size < frame.nbytes:
+                    self._slots[idx].close(); self._slots[idx].unlink()
+                    self._slots[idx] = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+                slot = self._slots[idx]
+            np.ndarray(frame.shape, dtype=np.uint8, buffer=slot.buf)[...] = frame
+            try:
+                fut = self._pool.submit(_decode_slot, slot.name, frame.shape)
+            except RuntimeError:  # pool shut down
+                return
+            fut.add_done_callback(lambda f, sid=sid, s=s, idx=idx, t0=queued_at: self._done(f, sid, s, idx, t0))
+
+    def _done(self, fut, sid, s, idx, t0):
+        try: code = fut.result()
+        except Exception: code = ""
+        with self._cond:
+            self._free.append(idx); s.busy = False
+            st = s.stats
+            st['decoded'] += 1
+            st['avg_ms'] += ((time.perf_counter() - t0) * 1000 - st['avg_ms']) / st['decoded']
+            if code:
+                st['hits'] += 1; s.last_code, s.last_code_at = code, time.time()
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            if self._closed: return
+            self._closed = True; self._cond.notify_all()
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        for slot in self._slots:
+            try: slot.close(); slot.unlink()
+            except (FileNotFoundError, BufferError): pass
@@ -0,0 +1,121 @@
+# ==============================================================================
+# COPYRIGHT NOTICE & LICENSE TERMS
+# ==============================================================================
+#  Software: QUANTIX Inventory System
+#  Owner:    Wildfire Consulting Services LLC
+#  Author:   Joao de Mendonca Salim
+#  Copyright (c) 2026 Wildfire Consulting Services LLC. All Rights Reserved.
+#
+#  LICENSE TERMS:
+#  This software is provided under a revocable, non-exclusive, non-transferable
+#  free license granted by Wildfire Consulting Services LLC.
+# ==============================================================================
+"""Sales velocity, days-of-cover and reorder suggestions for the whole catalog."""
+
+import io
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import inventory_store
+
+HISTORY_COLS = ['timestamp', 'product_id', 'product_name', 'action', 'amount', 'new_total']
+OUTFLOW_ACTIONS = ('SALE', 'REMOVE')
+MAX_COVER_DAYS = 36500  # no stockout date beyond ~100 years (and out of Timestamp range)
+
+
+class SalesLedger:
+    """Outflow events (SALE/REMOVE) of history.csv, read incrementally.
+
+    Only the bytes appended since the last refresh are parsed, so calling
+    refresh() on every rerun costs nothing when no movement was logged. A
+    history.csv replaced under the offset (restore) is read again from the start.
+    """
+
+    def __init__(self, history_file):
+        self.history_file = history_file
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._offset, self._mark = 0, ''
+        self._events = pd.DataFrame({'timestamp': pd.Series(dtype='datetime64[ns]'), 'product_id': pd.Series(dtype=str), 'amount': pd.Series(dtype=float)})
+
+    def refresh(self):
+        with self._lock:
+            if not os.path.exists(self.history_file):
+                self._reset(); return self._events
+            if os.path.getsize(self.history_file) < self._offset or inventory_store.history_tail(self.history_file, self._offset) != self._mark:
+                self._reset()  # file rewritten / restored
+            with open(self.history_file, 'rb') as f:
+                f.seek(self._offset)
+                chunk = f.read()
+            end = chunk.rfind(b'\n') + 1  # ignore a partially written last line
+            if end == 0: return self._events
+            new = pd.read_csv(io.BytesIO(chunk[:end]), header=0 if self._offset == 0 else None, names=HISTORY_COLS, dtype={'product_id': str})
+            self._offset += end
+            self._mark = inventory_store.history_tail(self.history_file, self._offset)
+            new = new[new['action'].isin(OUTFLOW_ACTIONS)]
+            if not new.empty:
+                new = pd.DataFrame({'timestamp': pd.to_datetime(new['timestamp'], errors='coerce'), 'product_id': new['product_id'].astype(str), 'amount': pd.to_numeric(new['amount'], errors='coerce').fillna(0).abs()})
+                self._events = pd.concat([self._events, new.dropna(subset=['timestamp'])], ignore_index=True)
+            return self._events
+
+    def save(self, path):
+        """Write the events read so far to `path`; returns the (offset, mark) of history they cover."""
+        with self._lock:
+            self._events.to_csv(path, index=False)
+            return self._offset, self._mark
+
+    def restore(self, path, offset, mark):
+        """Resume from a save() instead of reading history.csv from the start."""
+        events = pd.read_csv(path, dtype={'product_id': str, 'amount': float})
+        events['timestamp'] = pd.to_datetime(events['timestamp'])
+        with self._lock:
+            self._events, self._offset, self._mark = events, offset, mark
+
+
+def forecast(inventory, events, now=None, window_days=30, lead_days=7, cover_days=30):
+    """Per-SKU forecast aligned to `inventory` rows, computed in one vectorized pass.
+
+    velocity        units/day over the last `window_days` (or since the first event)
+    days_cover      quantity / velocity (inf when nothing moves)
+    stockout_date   projected date the SKU hits zero (NaT when nothing moves or beyond MAX_COVER_DAYS)
+    reorder_point   velocity * lead_days + min_stock
+    reorder_qty     units to order now to cover lead_days + cover_days
+    status          🔴 at/below min_stock or out within lead time, 🟡 below reorder point, 🟢 otherwise
+    """
+    now = pd.Timestamp(now or datetime.now())
+    start = now - pd.Timedelta(days=window_days)
+    if not events.empty:
+        start = max(start, events['timestamp'].min())
+    window = max((now - start) / pd.Timedelta(days=1), 1.0)
+    recent = events[(events['timestamp'] > now - pd.Timedelta(days=window_days)) & (events['timestamp'] <= now)]
+    sold = recent.groupby('product_id')['amount'].sum()
+
+    ids = inventory['product_id'].astype(str)
+    qty = pd.to_numeric(inventory['quantity'], errors='coerce').fillna(0).to_numpy(float)
+    mins = pd.to_numeric(inventory['min_stock'], errors='coerce').fillna(0).to_numpy(float)
+    velocity = sold.reindex(ids).fillna(0).to_numpy(float) / window
+
+    moving = velocity > 0
+    cover = np.full(len(qty), np.inf)
+    np.divide(qty, velocity, out=cover, where=moving)
+    reorder_point = velocity * lead_days + mins
+    target = velocity * (lead_days + cover_days) + mins
+    reorder_qty = np.where(qty <= reorder_point, np.ceil(np.clip(target - qty, 0, None)), 0).astype(int)
+    stockout = now + pd.to_timedelta(np.where(moving & (cover < MAX_COVER_DAYS), cover, np.nan), unit='D')
+    status = np.select([(qty <= 0) | (qty <= mins) | (cover <= lead_days), qty <= reorder_point], ['🔴', '🟡'], '🟢')
+
+    return pd.DataFrame({
+        'product_id': ids.to_numpy(),
+        'velocity': velocity.round(2),
+        'days_cover': cover.round(1),
+        'stockout_date': pd.DatetimeIndex(stockout).normalize(),
+        'reorder_point': np.ceil(reorder_point).astype(int),
+        'reorder_qty': reorder_qty,
+        'status': status,
+    }, index=inventory.index)
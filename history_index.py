@@ -0,0 +1,162 @@
+# ==============================================================================
+# COPYRIGHT NOTICE & LICENSE TERMS
+# ==============================================================================
+#  Software: QUANTIX Inventory System
+#  Owner:    Wildfire Consulting Services LLC
+#  Author:   Joao de Mendonca Salim
+#  Copyright (c) 2026 Wildfire Consulting Services LLC. All Rights Reserved.
+#
+#  LICENSE TERMS:
+#  This software is provided under a revocable, non-exclusive, non-transferable
+#  free license granted by Wildfire Consulting Services LLC.
+# ==============================================================================
+"""Per-product movement lookups over history.csv through its offset index.
+
+inventory_store.log_trans_many appends an "offset,length,product_id,action,
+amount" line to history.csv.idx for every history row it writes. HistoryIndex
+reads only the new index lines on refresh() and keeps, per product, the byte
+offsets of its rows and its totals, so one product's last N movements cost N
+small reads however long the history is.
+
+A missing or stale index (older installs, restored backups) is rebuilt from
+history.csv in one pass. refresh() returns at once while neither file's size
+or mtime has changed, so it can be called on every rerun.
+"""
+
+import io
+import os
+import threading
+from array import array
+
+import numpy as np
+import pandas as pd
+
+import inventory_store
+
+BLOCK_SIZE = 1024 * 1024
+
+
+class HistoryIndex:
+    def __init__(self, history_file):
+        self.history_file = history_file
+        self.index_file = history_file + inventory_store.INDEX_SUFFIX
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._read = 0        # bytes of the index file consumed
+        self._covered = 0     # end of the last indexed history row
+        self._last = None     # (offset, length, product_id) of that row, to detect a replaced history
+        self._rows = {}       # product_id -> (offsets, lengths)
+        self._totals = {}     # product_id -> {'movements', 'sold', 'added', 'removed'}
+        self._stat = None     # (size, mtime) of history and index when last refreshed
+
+    def _header_end(self):
+        with open(self.history_file, 'rb') as f: return len(f.readline())
+
+    def _still_valid(self):
+        """The last indexed row is still where the index says (history not rewritten or restored)."""
+        if self._last is None: return os.path.getsize(self.history_file) >= self._covered
+        off, length, pid = self._last
+        with open(self.history_file, 'rb') as f:
+            f.seek(off); raw = f.read(length)
+        if len(raw) != length or not raw.endswith(b'\n'): return False
+        row = pd.read_csv(io.BytesIO(raw), header=None, names=inventory_store.HISTORY_COLS, dtype=str)
+        return row['product_id'].iloc[0] == pid
+
+    def rebuild(self):
+        """Rewrite history.csv.idx from history.csv (held under the history lock so no append is missed)."""
+        with inventory_store.FileLock(self.history_file):
+            parts, pos = [], self._header_end()
+            with open(self.history_file, 'rb') as f:
+                f.seek(pos); carry = b''
+                while True:
+                    data = f.read(BLOCK_SIZE)
+                    buf = carry + data
+                    cut = buf.rfind(b'\n') + 1
+                    if cut:
+                        block, carry = buf[:cut], buf[cut:]
+                        ends = pos + np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == 10) + 1
+                        starts = np.concatenate([[pos], ends[:-1]])
+                        rows = pd.read_csv(io.BytesIO(block), header=None, names=inventory_store.HISTORY_COLS, dtype={'product_id': str, 'action': str}, skip_blank_lines=False)
+                        parts.append(pd.DataFrame({'offset': starts, 'length': ends - starts, 'product_id': rows['product_id'].to_numpy(), 'action': rows['action'].to_numpy(), 'amount': rows['amount'].to_numpy()}))
+                        pos += cut
+                    if not data: break
+            idx = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=inventory_store.INDEX_COLS)
+            tmp = self.index_file + '.tmp'
+            idx.dropna(subset=['product_id']).to_csv(tmp, header=False, index=False)
+            os.replace(tmp, self.index_file)
+        self._reset()
+
+    def _files_stat(self):
+        stat = []
+        for path in (self.history_file, self.index_file):
+            try: st = os.stat(path); stat.append((st.st_size, st.st_mtime_ns))
+            except OSError: stat.append(None)
+        return stat
+
+    def refresh(self):
+        with self._lock:
+            if not os.path.exists(self.history_file):
+                self._reset(); return self
+            stat = self._files_stat()  # taken first: a write during this refresh shows up next time
+            if stat == self._stat: return self
+            if not os.path.exists(self.index_file) or not self._still_valid(): self.rebuild()
+            self._read_index()
+            if self._trailing_rows():
+                with inventory_store.FileLock(self.history_file):  # maybe just a writer between its two appends
+                    self._read_index(); missing = self._trailing_rows()
+                if missing:  # rows appended without index entries
+                    self.rebuild(); self._read_index()
+            self._stat = stat
+            return self
+
+    def _read_index(self):
+        if self._covered == 0: self._covered = self._header_end()
+        with open(self.index_file, 'rb') as f:
+            f.seek(self._read); chunk = f.read()
+        end = chunk.rfind(b'\n') + 1
+        if end == 0: return
+        self._ingest(pd.read_csv(io.BytesIO(chunk[:end]), header=None, names=inventory_store.INDEX_COLS, dtype={'product_id': str, 'action': str}))
+        self._read += end
+
+    def _trailing_rows(self):
+        """Complete history rows past the indexed end (appended by something that skipped the index)."""
+        with open(self.history_file, 'rb') as f:
+            f.seek(self._covered); return b'\n' in f.read()
+
+    def _ingest(self, new):
+        new = new.dropna(subset=['product_id'])
+        if new.empty: return
+        codes, pids = pd.factorize(new['product_id'])
+        offs, lens = new['offset'].to_numpy(dtype='int64'), new['length'].to_numpy(dtype='int64')
+        amount = pd.to_numeric(new['amount'], errors='coerce').fillna(0).to_numpy()
+        action = new['action'].to_numpy(dtype=object)
+        order = np.argsort(codes, kind='stable')  # group rows by product, keeping file order inside a group
+        bounds = np.concatenate([[0], np.flatnonzero(np.diff(codes[order])) + 1, [len(order)]])
+        sums = {key: np.bincount(codes, weights=np.where(action == act, amount, 0), minlength=len(pids)) for act, key in (('SALE', 'sold'), ('ADD', 'added'), ('REMOVE', 'removed'))}
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            code = codes[order[start]]; pid = pids[code]
+            o, l = self._rows.setdefault(pid, (array('q'), array('q')))
+            sel = order[start:stop]
+            o.frombytes(offs[sel].tobytes()); l.frombytes(lens[sel].tobytes())
+            tot = self._totals.setdefault(pid, {'movements': 0, 'sold': 0, 'added': 0, 'removed': 0})
+            tot['movements'] += int(stop - start)
+            for key, col in sums.items(): tot[key] += int(col[code])
+        self._last = (int(offs[-1]), int(lens[-1]), new['product_id'].iloc[-1])
+        self._covered = max(self._covered, int(offs[-1] + lens[-1]))
+
+    def summary(self, product_id):
+        return dict(self._totals.get(str(product_id), {'movements': 0, 'sold': 0, 'added': 0, 'removed': 0}))
+
+    def timeline(self, product_id, n=50):
+        """Last `n` history rows of one product, oldest first; new_total is the running stock."""
+        offs, lens = self._rows.get(str(product_id), ((), ()))
+        if not offs: return pd.DataFrame(columns=inventory_store.HISTORY_COLS)
+        chunks = []
+        with open(self.history_file, 'rb') as f:
+            for off, length in zip(offs[-n:], lens[-n:]):
+                f.seek(off); chunks.append(f.read(length))
+        rows = pd.read_csv(io.BytesIO(b''.join(chunks)), header=None, names=inventory_store.HISTORY_COLS, dtype={'product_id': str, 'timestamp': str})
+        rows['timestamp'] = pd.to_datetime(rows['timestamp'], format=inventory_store.TS_FORMAT, errors='coerce')
+        return rows
@@ -16,17 +16,14 @@ import pandas as pd
 import cv2
 import numpy as np
 import os
+import sys
 import glob as globmod
 import qrcode
-import barcode
 import base64
 import requests
 import json
-import zipfile
-import io
 import urllib.parse
 import streamlit.components.v1 as components
-from barcode.writer import ImageWriter
 from datetime import datetime, timedelta
 from PIL import Image
 import time
@@ -35,6 +32,21 @@ import random
 import uuid
 from streamlit_webrtc import webrtc_streamer, WebRtcMode, RTCConfiguration
 import av
+import forecast
+import stock_history
+import history_index
+import assets
+import decoder
+import inventory_store
+import tenants
+import reports
+import restore
+import snapshot
+import jobs
+import maintenance
+import sync
+import shutil
+import tempfile
 
 try:
     from pillow_heif import register_heif_opener
@@ -178,7 +190,87 @@ LANG = {
         'delete_confirm': "Tem certeza que deseja excluir este item? Esta ação não pode ser desfeita.",
         'delete_ok': "Item excluído com sucesso!",
         'auto_backup_ok': "Backup automático criado.",
-        'cloud_warning': "⚠️ Dados em nuvem são temporários e podem ser perdidos ao reiniciar."
+        'cloud_warning': "⚠️ Dados em nuvem são temporários e podem ser perdidos ao reiniciar.",
+        'reorder_header': "🛒 Reposição",
+        'reorder_none': "Nenhum item precisa de reposição.",
+        'velocity': "Vendas/dia",
+        'days_cover': "Dias de Cobertura",
+        'stockout_date': "Previsão de Ruptura",
+        'reorder_qty': "Qtd. Sugerida",
+        'count_mode': "🧮 Contagem de Estoque",
+        'count_input': "Contagem:",
+        'count_expected': "Sistema",
+        'count_counted': "Contado",
+        'count_diff': "Diferença",
+        'count_commit': "✅ Aplicar Contagem",
+        'count_reset': "🗑️ Descartar Contagem",
+        'count_empty': "Escaneie os itens da prateleira para começar.",
+        'count_done': "Contagem aplicada!",
+        'asof_header': "🕰️ Estoque em Data",
+        'asof_at': "Estoque em:",
+        'asof_range': "Movimentação entre:",
+        'asof_stock': "Posição na Data",
+        'asof_move': "Movimentação no Período",
+        'asof_run': "🔍 Consultar",
+        'opening': "Inicial",
+        'closing': "Final",
+        'asset_fmt': "Formato:",
+        'dl_qr': "⬇️ Baixar QR",
+        'dl_barcode': "⬇️ Baixar Barcode",
+        'last_read': "Último código lido:",
+        'decode_stats': "Decodificação",
+        'tenant_unknown': "🚫 Loja não encontrada",
+        'tenant_code': "🏪 Código da Loja",
+        'tenant_switch': "Entrar",
+        'tenant_pass': "🔑 Senha",
+        'tenant_login': "🏪 Entrar na Loja",
+        'tenant_bad_login': "🚫 Código ou senha inválidos",
+        'report_header': "📤 Relatórios",
+        'report_kind': "Relatório:",
+        'report_valuation': "Valorização do Estoque",
+        'report_sales': "Vendas",
+        'report_movements': "Movimentações",
+        'report_by': "Agrupar por:",
+        'by_product': "Produto",
+        'by_day': "Dia",
+        'by_month': "Mês",
+        'report_run': "📄 Gerar Relatório",
+        'report_download': "📥 Baixar Relatório",
+        'restore_header': "♻️ Restaurar Backup",
+        'restore_pick': "Backup:",
+        'restore_dry': "🔍 Simular",
+        'restore_btn': "♻️ Restaurar",
+        'restore_confirm': "Os dados atuais serão substituídos pelo backup (um backup automático será criado antes).",
+        'restore_ok': "Backup restaurado!",
+        'restore_none': "Nenhum backup disponível.",
+        'restore_files': "Arquivos",
+        'restore_qty_changed': "Qtd. alterada",
+        'snap_none': "Nenhum snapshot publicado ainda. Execute: python snapshot.py",
+        'snap_at': "Dados de",
+        'schema_warn': "⚠️ inventory.csv",
+        'timeline': "🕒 Movimentações do Produto",
+        'timeline_n': "Últimas:",
+        'timeline_moves': "Movimentações",
+        'timeline_sold': "Vendidos",
+        'timeline_revenue': "Receita (preço atual)",
+        'timeline_empty': "Sem movimentações registradas.",
+        'timeline_when': "Data",
+        'timeline_stock': "Estoque",
+        'jobs': "⚙️ Tarefas em segundo plano",
+        'jobs_none': "Nenhuma tarefa recente.",
+        'job_queued': "Tarefa enviada para segundo plano.",
+        'job_backup': "Backup",
+        'job_image': "Imagem",
+        'job_repair': "Reparo do inventário",
+        'backup_now': "💾 Criar Backup Agora",
+        'backup_none': "Nenhum backup ainda.",
+        'job_sync': "Sincronização",
+        'sync_header': "🔄 Sincronizar Lojas",
+        'sync_btn': "🔄 Sincronizar Agora",
+        'sync_site': "Esta loja",
+        'sync_last': "Última sincronização",
+        'sync_pending': "Produtos aguardando cadastro",
+        'sync_off': "Sincronização não configurada (python sync.py init)."
     },
     'EN': {
         'lic_suspended': "🚫 LICENSE SUSPENDED",
@@ -284,7 +376,87 @@ LANG = {
         'delete_confirm': "Are you sure you want to delete this item? This action cannot be undone.",
         'delete_ok': "Item deleted successfully!",
         'auto_backup_ok': "Auto-backup created.",
-        'cloud_warning': "⚠️ Cloud data is ephemeral and may be lost on restart."
+        'cloud_warning': "⚠️ Cloud data is ephemeral and may be lost on restart.",
+        'reorder_header': "🛒 Reorder",
+        'reorder_none': "No items need reordering.",
+        'velocity': "Sales/day",
+        'days_cover': "Days of Cover",
+        'stockout_date': "Projected Stock-out",
+        'reorder_qty': "Suggested Qty",
+        'count_mode': "🧮 Cycle Count",
+        'count_input': "Count:",
+        'count_expected': "System",
+        'count_counted': "Counted",
+        'count_diff': "Difference",
+        'count_commit': "✅ Commit Count",
+        'count_reset': "🗑️ Discard Count",
+        'count_empty': "Scan the shelf items to start.",
+        'count_done': "Count committed!",
+        'asof_header': "🕰️ Stock at Date",
+        'asof_at': "Stock at:",
+        'asof_range': "Movement between:",
+        'asof_stock': "Position at Date",
+        'asof_move': "Movement in Period",
+        'asof_run': "🔍 Query",
+        'opening': "Opening",
+        'closing': "Closing",
+        'asset_fmt': "Format:",
+        'dl_qr': "⬇️ Download QR",
+        'dl_barcode': "⬇️ Download Barcode",
+        'last_read': "Last code read:",
+        'decode_stats': "Decoding",
+        'tenant_unknown': "🚫 Unknown store",
+        'tenant_code': "🏪 Store Code",
+        'tenant_switch': "Switch",
+        'tenant_pass': "🔑 Password",
+        'tenant_login': "🏪 Store Login",
+        'tenant_bad_login': "🚫 Invalid store code or password",
+        'report_header': "📤 Reports",
+        'report_kind': "Report:",
+        'report_valuation': "Stock Valuation",
+        'report_sales': "Sales",
+        'report_movements': "Movement Log",
+        'report_by': "Group by:",
+        'by_product': "Product",
+        'by_day': "Day",
+        'by_month': "Month",
+        'report_run': "📄 Generate Report",
+        'report_download': "📥 Download Report",
+        'restore_header': "♻️ Restore Backup",
+        'restore_pick': "Backup:",
+        'restore_dry': "🔍 Dry Run",
+        'restore_btn': "♻️ Restore",
+        'restore_confirm': "Current data will be replaced by the backup (an auto-backup is taken first).",
+        'restore_ok': "Backup restored!",
+        'restore_none': "No backups available.",
+        'restore_files': "Files",
+        'restore_qty_changed': "Qty changed",
+        'snap_none': "No snapshot published yet. Run: python snapshot.py",
+        'snap_at': "Data as of",
+        'schema_warn': "⚠️ inventory.csv",
+        'timeline': "🕒 Product Movements",
+        'timeline_n': "Last:",
+        'timeline_moves': "Movements",
+        'timeline_sold': "Sold",
+        'timeline_revenue': "Revenue (current price)",
+        'timeline_empty': "No movements logged.",
+        'timeline_when': "Date",
+        'timeline_stock': "Stock",
+        'jobs': "⚙️ Background jobs",
+        'jobs_none': "No recent jobs.",
+        'job_queued': "Job sent to the background.",
+        'job_backup': "Backup",
+        'job_image': "Image",
+        'job_repair': "Inventory repair",
+        'backup_now': "💾 Create Backup Now",
+        'backup_none': "No backups yet.",
+        'job_sync': "Sync",
+        'sync_header': "🔄 Store Sync",
+        'sync_btn': "🔄 Sync Now",
+        'sync_site': "This store",
+        'sync_last': "Last sync",
+        'sync_pending': "Products waiting to be created",
+        'sync_off': "Sync is not set up (python sync.py init)."
     },
     'ES': {
         'lic_suspended': "🚫 LICENCIA SUSPENDIDA",
@@ -390,7 +562,87 @@ LANG = {
         'delete_confirm': "¿Está seguro de eliminar este artículo? Esta acción no se puede deshacer.",
         'delete_ok': "¡Artículo eliminado!",
         'auto_backup_ok': "Backup automático creado.",
-        'cloud_warning': "⚠️ Los datos en la nube son temporales y pueden perderse al reiniciar."
+        'cloud_warning': "⚠️ Los datos en la nube son temporales y pueden perderse al reiniciar.",
+        'reorder_header': "🛒 Reposición",
+        'reorder_none': "Ningún artículo necesita reposición.",
+        'velocity': "Ventas/día",
+        'days_cover': "Días de Cobertura",
+        'stockout_date': "Quiebre Previsto",
+        'reorder_qty': "Cant. Sugerida",
+        'count_mode': "🧮 Conteo de Inventario",
+        'count_input': "Conteo:",
+        'count_expected': "Sistema",
+        'count_counted': "Contado",
+        'count_diff': "Diferencia",
+        'count_commit': "✅ Aplicar Conteo",
+        'count_reset': "🗑️ Descartar Conteo",
+        'count_empty': "Escanee los artículos del estante para comenzar.",
+        'count_done': "¡Conteo aplicado!",
+        'asof_header': "🕰️ Stock en Fecha",
+        'asof_at': "Stock en:",
+        'asof_range': "Movimiento entre:",
+        'asof_stock': "Posición en Fecha",
+        'asof_move': "Movimiento en Período",
+        'asof_run': "🔍 Consultar",
+        'opening': "Inicial",
+        'closing': "Final",
+        'asset_fmt': "Formato:",
+        'dl_qr': "⬇️ Descargar QR",
+        'dl_barcode': "⬇️ Descargar Barcode",
+        'last_read': "Último código leído:",
+        'decode_stats': "Decodificación",
+        'tenant_unknown': "🚫 Tienda no encontrada",
+        'tenant_code': "🏪 Código de Tienda",
+        'tenant_switch': "Entrar",
+        'tenant_pass': "🔑 Contraseña",
+        'tenant_login': "🏪 Entrar a la Tienda",
+        'tenant_bad_login': "🚫 Código o contraseña inválidos",
+        'report_header': "📤 Informes",
+        'report_kind': "Informe:",
+        'report_valuation': "Valorización del Stock",
+        'report_sales': "Ventas",
+        'report_movements': "Movimientos",
+        'report_by': "Agrupar por:",
+        'by_product': "Producto",
+        'by_day': "Día",
+        'by_month': "Mes",
+        'report_run': "📄 Generar Informe",
+        'report_download': "📥 Descargar Informe",
+        'restore_header': "♻️ Restaurar Backup",
+        'restore_pick': "Backup:",
+        'restore_dry': "🔍 Simular",
+        'restore_btn': "♻️ Restaurar",
+        'restore_confirm': "Los datos actuales serán reemplazados por el backup (se crea un backup automático antes).",
+        'restore_ok': "¡Backup restaurado!",
+        'restore_none': "No hay backups disponibles.",
+        'restore_files': "Archivos",
+        'restore_qty_changed': "Cant. cambiada",
+        'snap_none': "Aún no hay snapshot publicado. Ejecute: python snapshot.py",
+        'snap_at': "Datos de",
+        'schema_warn': "⚠️ inventory.csv",
+        'timeline': "🕒 Movimientos del Producto",
+        'timeline_n': "Últimos:",
+        'timeline_moves': "Movimientos",
+        'timeline_sold': "Vendidos",
+        'timeline_revenue': "Ingresos (precio actual)",
+        'timeline_empty': "Sin movimientos registrados.",
+        'timeline_when': "Fecha",
+        'timeline_stock': "Stock",
+        'jobs': "⚙️ Tareas en segundo plano",
+        'jobs_none': "Sin tareas recientes.",
+        'job_queued': "Tarea enviada a segundo plano.",
+        'job_backup': "Backup",
+        'job_image': "Imagen",
+        'job_repair': "Reparación del inventario",
+        'backup_now': "💾 Crear Backup Ahora",
+        'backup_none': "Aún no hay backups.",
+        'job_sync': "Sincronización",
+        'sync_header': "🔄 Sincronizar Tiendas",
+        'sync_btn': "🔄 Sincronizar Ahora",
+        'sync_site': "Esta tienda",
+        'sync_last': "Última sincronización",
+        'sync_pending': "Productos esperando registro",
+        'sync_off': "Sincronización no configurada (python sync.py init)."
     }
 }
 
@@ -400,50 +652,98 @@ def t(key):
     return LANG[lang].get(key, key)
 
 # --- 3. CONFIGURATION & PATHS ---
-CONFIG_FILE = 'config.json'
-DATA_FILE = 'inventory.csv'
-HISTORY_FILE = 'history.csv'
-QR_FOLDER = 'qr_codes'
-BARCODE_FOLDER = 'barcodes'
-IMG_FOLDER = 'product_images'
-LOGO_FILE = 'logo.png'
-PLACEHOLDER_FILE = 'placeholder.png'
+# Tenant comes from ?tenant=<id> or the store code in the sidebar; '' is the install folder.
+# A tenant opens only after its password was entered in this browser session.
+TENANT_STATE_KEYS = ['count_session', 'count_rev', 'editor_rev', 'confirm_delete', 'confirm_restore', 'cam_sid', 'jobs_live']
+TENANT = st.session_state.pop('tenant_request', None)  # set by a login / switch, before the URL catches up
+if TENANT is None: TENANT = str(st.query_params.get('tenant', st.session_state.get('tenant', ''))).strip().lower()
+if 'tenant_auth' not in st.session_state: st.session_state.tenant_auth = []
+if not tenants.exists(TENANT) or (tenants.needs_password(TENANT) and TENANT not in st.session_state.tenant_auth):
+    st.set_page_config(page_title="QUANTIX", page_icon="🔑")
+    st.title(t('tenant_login'))
+    if not tenants.exists(TENANT): st.error(f"{t('tenant_unknown')}: {TENANT}")
+    with st.form("tenant_gate"):
+        code = st.text_input(t('tenant_code'), value=TENANT).strip().lower()
+        password = st.text_input(t('tenant_pass'), type="password")
+        if st.form_submit_button(t('tenant_switch')):
+            if tenants.exists(code) and (not tenants.needs_password(code) or tenants.check_password(code, password)):
+                st.session_state.tenant_auth.append(code); st.session_state.tenant_request = code
+                if code: st.query_params['tenant'] = code
+                else: st.query_params.pop('tenant', None)
+                st.rerun()
+            else: st.error(t('tenant_bad_login'))
+    st.stop()
+if st.session_state.get('tenant', TENANT) != TENANT:
+    for key in TENANT_STATE_KEYS: st.session_state.pop(key, None)  # a count or confirmation never carries over
+st.session_state.tenant = TENANT
+DATA_ROOT = tenants.root(TENANT)
+TENANT_CACHE_MAX = 8  # per-tenant cached resources kept in memory (LRU)
+
+CONFIG_FILE = os.path.join(DATA_ROOT, 'config.json')
+DATA_FILE = os.path.join(DATA_ROOT, 'inventory.csv')
+HISTORY_FILE = os.path.join(DATA_ROOT, 'history.csv')
+QR_FOLDER = os.path.join(DATA_ROOT, 'qr_codes')  # legacy: QR codes and barcodes are now rendered on demand (assets.py)
+BARCODE_FOLDER = os.path.join(DATA_ROOT, 'barcodes')
+ASSET_CACHE_FOLDER = 'asset_cache'  # shared: assets depend only on the product_id
+IMG_FOLDER = os.path.join(DATA_ROOT, 'product_images')
+LOGO_FILE = os.path.join(DATA_ROOT, 'logo.png')
+PLACEHOLDER_FILE = os.path.join(DATA_ROOT, 'placeholder.png')
 APP_ICON_FILE = 'app.jpg' 
 
-BACKUP_FOLDER = 'backups'
+BACKUP_FOLDER = os.path.join(DATA_ROOT, 'backups')
 BACKUP_MAX = 10
+JOB_WORKERS = 2  # background job threads shared by every session and tenant
+CHECKPOINT_FOLDER = os.path.join(DATA_ROOT, 'checkpoints')
+SNAPSHOT_FOLDER = os.path.join(DATA_ROOT, snapshot.SNAPSHOT_FOLDER)
+
+# Viewer mode (streamlit run inventory_app.py -- --viewer): dashboard and catalog served
+# read-only from the snapshot published by snapshot.py, never from the live files
+VIEWER = '--viewer' in sys.argv[1:]
+
+# Reorder forecasting: sales window, supplier lead time and target cover (days)
+REORDER_WINDOW_DAYS = 30
+REORDER_LEAD_DAYS = 7
+REORDER_COVER_DAYS = 30
+
+# Analysis periods shared by the dashboard and the report exports (translation key -> days)
+PERIOD_DAYS = {'p_7d': 7, 'p_30d': 30, 'p_3m': 90, 'p_6m': 180, 'p_1y': 365, 'p_all': 36500}
 
-for folder in [QR_FOLDER, BARCODE_FOLDER, IMG_FOLDER, BACKUP_FOLDER]:
+for folder in [IMG_FOLDER, BACKUP_FOLDER]:
     if not os.path.exists(folder): os.makedirs(folder)
 
-def convert_uploaded_image_to_png(uploaded_file, save_path):
-    """Convert any uploaded image (including HEIC/HEIF) to PNG and save it."""
-    img = Image.open(uploaded_file)
-    img = img.convert("RGB")
-    img.save(save_path, "PNG")
+# Heavy maintenance (backups, image conversion, asset rendering, CSV repair) runs as background
+# jobs (jobs.py / maintenance.py); the script only enqueues them and shows their status
+@st.cache_resource
+def get_job_pool():
+    return jobs.make_pool(JOB_WORKERS)
 
-def auto_backup():
-    """Create an auto-backup ZIP on startup if data has changed. Keep last N backups."""
-    if not os.path.exists(DATA_FILE):
-        return
-    existing = sorted(globmod.glob(os.path.join(BACKUP_FOLDER, "backup_*.zip")))
-    if existing:
-        last_backup_time = os.path.getmtime(existing[-1])
-        data_mod_time = os.path.getmtime(DATA_FILE)
-        if data_mod_time <= last_backup_time:
-            return
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_path = os.path.join(BACKUP_FOLDER, f"backup_{timestamp}.zip")
-    with zipfile.ZipFile(backup_path, "w", zipfile.ZIP_DEFLATED) as z:
-        for f in [DATA_FILE, HISTORY_FILE, CONFIG_FILE, LOGO_FILE, PLACEHOLDER_FILE]:
-            if os.path.exists(f): z.write(f)
-        for folder in [IMG_FOLDER, QR_FOLDER, BARCODE_FOLDER]:
-            if os.path.exists(folder):
-                for root, _, files in os.walk(folder):
-                    for file in files: z.write(os.path.join(root, file))
-    existing = sorted(globmod.glob(os.path.join(BACKUP_FOLDER, "backup_*.zip")))
-    while len(existing) > BACKUP_MAX:
-        os.remove(existing.pop(0))
+@st.cache_resource
+def get_job_runner(root):
+    return jobs.JobRunner(os.path.join(root, 'jobs.json'), maintenance.HANDLERS, get_job_pool())
+
+def submit_job(kind, key=None, **params):
+    return get_job_runner(DATA_ROOT).submit(kind, key=key, **params)
+
+# Cached readers shared by the sidebar (restore clears them) and the tabs
+@st.cache_resource(max_entries=TENANT_CACHE_MAX)
+def get_sales_ledger(path):
+    return forecast.SalesLedger(path)
+
+@st.cache_resource
+def get_decode_service():
+    return decoder.DecodeService()
+
+@st.cache_resource
+def get_asset_cache(folder):
+    return assets.AssetCache(folder)
+
+@st.cache_resource(max_entries=TENANT_CACHE_MAX)
+def get_stock_history(path, folder):
+    return stock_history.StockHistory(path, folder)
+
+@st.cache_resource(max_entries=TENANT_CACHE_MAX)
+def get_history_index(path):
+    return history_index.HistoryIndex(path)
 
 if not os.path.exists(PLACEHOLDER_FILE):
     img = np.zeros((300, 300, 3), dtype=np.uint8)
@@ -466,17 +766,6 @@ def save_config(name):
         current['company_name'] = name
         with open(CONFIG_FILE, 'w') as f: json.dump(current, f)
 
-def create_backup_zip():
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as z:
-        for f in [DATA_FILE, HISTORY_FILE, CONFIG_FILE, LOGO_FILE, PLACEHOLDER_FILE]:
-            if os.path.exists(f): z.write(f)
-        for folder in [IMG_FOLDER, QR_FOLDER, BARCODE_FOLDER]:
-            if os.path.exists(folder):
-                for root, _, files in os.walk(folder):
-                    for file in files: z.write(os.path.join(root, file))
-    return buffer.getvalue()
-
 # --- 4. FIRST RUN SETUP & LICENSE CHECK ---
 if 'lang' not in st.session_state: st.session_state.lang = 'PT'
 
@@ -591,8 +880,8 @@ else:
 # --- 5. MAIN APP UI ---
 st.set_page_config(page_title=f"QUANTIX | {config.get('company_name')}", page_icon=page_icon_to_use, layout="wide")
 
-# Auto-backup on startup
-auto_backup()
+# Auto-backup on startup (in the background; one at a time)
+if not VIEWER and maintenance.backup_due(DATA_ROOT): submit_job('backup', key='backup', root=DATA_ROOT, keep=BACKUP_MAX)
 
 # Style the native file uploader drop zones
 st.markdown("""<style>
@@ -618,20 +907,86 @@ with st.sidebar:
         st.session_state.lang = lang_choice
         st.rerun()
 
-    with st.expander(t('settings')):
-        with st.form("settings"):
-            new_n = st.text_input(t('name'), value=config.get('company_name'))
-            new_l = st.file_uploader("Logo", type=['png','jpg'])
-            if st.form_submit_button(t('save')):
-                save_config(new_n)
-                if new_l:
-                    with open(LOGO_FILE, "wb") as f: f.write(new_l.getbuffer())
-                st.rerun()
+    if not VIEWER:
+        with st.expander(t('settings')):
+            with st.form("settings"):
+                new_n = st.text_input(t('name'), value=config.get('company_name'))
+                new_l = st.file_uploader("Logo", type=['png','jpg'])
+                if st.form_submit_button(t('save')):
+                    save_config(new_n)
+                    if new_l:
+                        with open(LOGO_FILE, "wb") as f: f.write(new_l.getbuffer())
+                    st.rerun()
         
-        st.markdown("---")
-        st.markdown(f"**{t('h_backup')}**")
-        zip_data = create_backup_zip()
-        st.download_button(label=t('backup_btn'), data=zip_data, file_name=f"quantix_backup_{datetime.now().strftime('%Y%m%d')}.zip", mime="application/zip", help=t('h_backup'))
+            st.markdown("---")
+            st.markdown(f"**{t('h_backup')}**")
+            if st.button(t('backup_now'), use_container_width=True):
+                submit_job('backup', key='backup', root=DATA_ROOT, force=True, keep=BACKUP_MAX); st.toast(t('job_queued'), icon="⚙️")
+            latest = maintenance.latest_backup(DATA_ROOT)
+            if latest:
+                def read_backup(path=latest):
+                    with open(path, 'rb') as f: return f.read()  # only when the download is clicked
+                st.download_button(label=t('backup_btn'), data=read_backup, file_name=f"quantix_{os.path.basename(latest)}", mime="application/zip", help=t('h_backup'), on_click='ignore')
+            else: st.caption(t('backup_none'))
+
+            st.markdown("---")
+            st.markdown(f"**{t('restore_header')}**")
+            backups = restore.list_backups(BACKUP_FOLDER)
+            if backups:
+                pick = st.selectbox(t('restore_pick'), backups, format_func=lambda b: f"{b['created']:%Y-%m-%d %H:%M} · {b['size'] / 1048576:.1f} MB")
+                rc1, rc2 = st.columns(2)
+                if rc1.button(t('restore_dry'), use_container_width=True):
+                    problems = restore.validate(pick['path'], DATA_ROOT)
+                    if problems:
+                        for p in problems: st.error(p)
+                    else:
+                        rp = restore.plan(pick['path'], DATA_ROOT)
+                        st.caption(f"{t('restore_files')}: {len(rp['replaced'])} ↻ · {len(rp['added'])} + · {len(rp['removed'])} −")
+                        st.caption(f"{t('items')}: +{rp['products']['added']} · −{rp['products']['removed']} · {t('restore_qty_changed')}: {rp['products']['quantity_changed']}")
+                        if 'history_rows' in rp: st.caption(f"{t('hist_header')}: {rp['history_rows']['live']} → {rp['history_rows']['backup']}")
+                if rc2.button(t('restore_btn'), type="primary", use_container_width=True): st.session_state['confirm_restore'] = pick['path']
+                if st.session_state.get('confirm_restore') == pick['path']:
+                    st.warning(t('restore_confirm'))
+                    if st.button("✅ Confirm", key="restore_yes", use_container_width=True):
+                        # Work from a copy: the pre-restore backup may rotate the chosen archive out.
+                        # Restore stays inline: the user confirmed it and waits for the result
+                        with tempfile.TemporaryDirectory() as tmp_dir:
+                            src = shutil.copy(pick['path'], tmp_dir)
+                            maintenance.backup(lambda *a: None, DATA_ROOT, force=True, keep=BACKUP_MAX)
+                            try:
+                                restore.restore(src, DATA_ROOT)
+                                get_sales_ledger.clear(); get_stock_history.clear(); get_history_index.clear()
+                                st.session_state.pop('confirm_restore', None); st.session_state.pop('count_session', None)
+                                st.success(t('restore_ok')); time.sleep(1); st.rerun()
+                            except ValueError as e: st.error(str(e))
+            else: st.caption(t('restore_none'))
+
+            st.markdown("---")
+            st.markdown(f"**{t('sync_header')}**")
+            sync_state = sync.read_state(DATA_ROOT)
+            if sync_state:
+                st.caption(f"{t('sync_site')}: {sync_state['site']} · {t('sync_last')}: {sync_state['last_sync'] or '-'}")
+                if sync_state['pending']: st.caption(f"{t('sync_pending')}: {', '.join(sorted(sync_state['pending']))}")
+                if st.button(t('sync_btn'), use_container_width=True):
+                    submit_job('sync', key='sync', root=DATA_ROOT); st.toast(t('job_queued'), icon="⚙️")
+            else: st.caption(t('sync_off'))
+
+    if not VIEWER:
+        def job_status():
+            runner = get_job_runner(DATA_ROOT)
+            active = runner.jobs(active_only=True)
+            for j in active: st.progress(j['progress'], text=f"{t('job_' + j['kind'])} · {j['message']}"[:80])
+            if not active and st.session_state.pop('jobs_live', False): st.rerun()  # refresh what the jobs changed
+            with st.expander(t('jobs')):
+                recent = [j for j in runner.jobs(limit=8) if j['status'] not in jobs.ACTIVE]
+                for j in recent: st.caption(f"{'✅' if j['status'] == 'done' else '❌'} {j['finished']} · {t('job_' + j['kind'])} · {j['message']}")
+                if not recent: st.caption(t('jobs_none'))
+        # Poll only while something is running; the last poll reruns the page once
+        if get_job_runner(DATA_ROOT).jobs(active_only=True):
+            st.session_state['jobs_live'] = True
+            st.fragment(run_every=2)(job_status)()
+        else:
+            st.session_state.pop('jobs_live', None); job_status()
     
     st.markdown("---")
     st.header(t('connect'))
@@ -641,50 +996,51 @@ with st.sidebar:
             ip = s.getsockname()[0]; s.close(); return ip
         except: return "127.0.0.1"
     ip = get_ip()
-    st.image(qrcode.make(f"http://{ip}:8501").get_image(), width=150)
-    st.caption(f"http://{ip}:8501")
+    app_url = f"http://{ip}:8501" + (f"/?tenant={TENANT}" if TENANT else "")
+    st.image(qrcode.make(app_url).get_image(), width=150)
+    st.caption(app_url)
+    if tenants.list_tenants():
+        with st.form("tenant_login"):
+            new_tenant = st.text_input(t('tenant_code'), value=TENANT)
+            if st.form_submit_button(t('tenant_switch')):
+                new_tenant = new_tenant.strip().lower()
+                if tenants.exists(new_tenant):  # the password is asked for at the top of the next run
+                    st.session_state.tenant_request = new_tenant
+                    if new_tenant: st.query_params['tenant'] = new_tenant
+                    else: st.query_params.pop('tenant', None)
+                    st.rerun()
+                else: st.error(t('tenant_unknown'))
 
 st.title(f"📦 {config.get('company_name')}")
 
 # --- DEFINING COLUMNS (THE MISSING PIECE) ---
-EXPECTED_COLS = ['product_id', 'product_name', 'quantity', 'min_stock', 'cost_price', 'sell_price', 'last_updated', 'image_path', 'qr_path', 'barcode_path']
+# Column list and dtypes live in inventory_store so the API, reports and snapshots read the same schema
+EXPECTED_COLS = inventory_store.INVENTORY_COLS
 
 def load_data():
     if not os.path.exists(DATA_FILE):
-        df = pd.DataFrame(columns=EXPECTED_COLS)
-        df.to_csv(DATA_FILE, index=False)
+        df = inventory_store.apply_schema(pd.DataFrame(columns=EXPECTED_COLS))
+        inventory_store.write_inventory(DATA_FILE, df)
         return df
-    df = pd.read_csv(DATA_FILE)
-    df['product_id'] = df['product_id'].astype(str)
-    changed = False
-    for col in EXPECTED_COLS:
-        if col not in df.columns:
-            df[col] = 0.0 if 'price' in col else None
-            changed = True
-    for i, row in df.iterrows():
-        pid = str(row['product_id'])
-        found_img = False
-        current_path = str(row.get('image_path'))
-        if pd.isna(current_path) or not os.path.exists(current_path) or current_path == 'nan':
-            for ext in ['.png', '.jpg', '.jpeg']:
-                p = os.path.join(IMG_FOLDER, f"{pid}{ext}")
-                if os.path.exists(p): 
-                    df.at[i, 'image_path'] = p; found_img = True; changed = True; break
-            if not found_img: df.at[i, 'image_path'] = PLACEHOLDER_FILE; changed = True
-        qp = os.path.join(QR_FOLDER, f"{pid}.png")
-        if (pd.isna(row.get('qr_path')) or row.get('qr_path') != qp) and os.path.exists(qp): df.at[i, 'qr_path'] = qp; changed = True
-        bp = os.path.join(BARCODE_FOLDER, f"{pid}.png")
-        if (pd.isna(row.get('barcode_path')) or row.get('barcode_path') != bp) and os.path.exists(bp): df.at[i, 'barcode_path'] = bp; changed = True
-    if changed: df.to_csv(DATA_FILE, index=False)
+    df = inventory_store.read_inventory(DATA_FILE)
+    # Missing columns / image paths are fixed in memory here and written back by a background job
+    paths = maintenance.image_paths(df, IMG_FOLDER, PLACEHOLDER_FILE)
+    if df.attrs['added_cols'] or not paths.fillna('').equals(df['image_path'].fillna('')):
+        df['image_path'] = paths
+        if not VIEWER: submit_job('repair', key='repair', data_file=DATA_FILE, img_folder=IMG_FOLDER, placeholder=PLACEHOLDER_FILE)
     return df
 
-def save_data(df): df.to_csv(DATA_FILE, index=False)
+def save_edits(updates=None, added=(), deleted=()):
+    """Write only the cells the user changed, under the inventory lock (the API may have moved stock since load_data)."""
+    return inventory_store.apply_edits(DATA_FILE, updates, added, deleted)
+
+def commit_count(counts):
+    """Set counted quantities for a cycle-count session: one CSV write, one ADJUST record per changed SKU."""
+    return inventory_store.apply_counts(DATA_FILE, HISTORY_FILE, counts)
 
-def log_trans(pid, name, change, total, custom_action=None):
-    if not os.path.exists(HISTORY_FILE): pd.DataFrame(columns=['timestamp', 'product_id', 'product_name', 'action', 'amount', 'new_total']).to_csv(HISTORY_FILE, index=False)
-    if custom_action: action = custom_action
-    else: action = "ADD" if change > 0 else "REMOVE"
-    pd.DataFrame([{'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 'product_id': pid, 'product_name': name, 'action': action, 'amount': abs(change), 'new_total': total}]).to_csv(HISTORY_FILE, mode='a', header=False, index=False)
+def stock_forecast(df):
+    events = get_sales_ledger(HISTORY_FILE).refresh()
+    return forecast.forecast(df, events, window_days=REORDER_WINDOW_DAYS, lead_days=REORDER_LEAD_DAYS, cover_days=REORDER_COVER_DAYS)
 
 def path_to_image_html(path):
     if pd.isna(path) or not os.path.exists(str(path)): return None
@@ -695,13 +1051,7 @@ def path_to_image_html(path):
             return f"data:image/{ext};base64,{encoded}"
     except: return None
 
-tab_dash, tab_scan, tab_gen, tab_data_ui = st.tabs([t('tab_dash'), t('tab_scan'), t('tab_create'), t('tab_data')])
-
-with tab_dash:
-    st.header(t('dash_header'), help=t('desc_dash'))
-    df = load_data()
-    df['cost_price'] = pd.to_numeric(df['cost_price'], errors='coerce').fillna(0)
-    df['sell_price'] = pd.to_numeric(df['sell_price'], errors='coerce').fillna(0)
+def stock_metrics(df):
     m1, m2, m3, m4 = st.columns(4)
     m1.metric(t('items'), len(df))
     m2.metric(t('pieces'), int(df['quantity'].sum()))
@@ -710,33 +1060,95 @@ with tab_dash:
     m3.metric(t('stock_val'), f"${tot_cost:,.2f}")
     m4.metric(t('pot_sales'), f"${tot_sell:,.2f}", delta=f"{t('profit')}: {tot_sell-tot_cost:,.2f}")
     st.markdown("---")
+
+def sales_panel(sales):
+    """Period profit and charts from sales rows with date, amount and profit columns."""
+    now = datetime.now().date()
+    st.subheader(t('ana_period'))
+    days_map = {t(k): d for k, d in PERIOD_DAYS.items()}
+    period_opt = st.selectbox("Selecione:", list(days_map), label_visibility="collapsed")
+    days = days_map[period_opt]
+    curr_mask = (sales['date'] > now - timedelta(days=days)) & (sales['date'] <= now)
+    prev_mask = (sales['date'] > now - timedelta(days=days*2)) & (sales['date'] <= now - timedelta(days=days))
+    val_curr = sales[curr_mask]['profit'].sum(); val_prev = sales[prev_mask]['profit'].sum(); delta = val_curr - val_prev
+    st.metric(f"💰 Lucro ({period_opt})", f"${val_curr:,.2f}", delta=f"{delta:,.2f} {t('vs_prev')}")
+    g_tab1, g_tab2, g_tab3 = st.tabs([t('g_daily'), t('g_cum'), t('g_vol')])
+    chart_data = sales[curr_mask].copy()
+    if not chart_data.empty:
+        grouped_day = chart_data.groupby('date')['profit'].sum()
+        grouped_cum = chart_data.groupby('date')['profit'].sum().cumsum()
+        grouped_vol = chart_data.groupby('date')['amount'].sum()
+        with g_tab1: st.bar_chart(grouped_day)
+        with g_tab2: st.line_chart(grouped_cum)
+        with g_tab3: st.area_chart(grouped_vol)
+    else: st.info("Sem dados para este período.")
+
+REORDER_COLUMN_CONFIG = {"status": st.column_config.TextColumn("St", width="small"), "velocity": st.column_config.NumberColumn(t('velocity'), format="%.2f"), "days_cover": st.column_config.NumberColumn(t('days_cover'), format="%.1f"), "stockout_date": st.column_config.DateColumn(t('stockout_date')), "reorder_qty": st.column_config.NumberColumn(t('reorder_qty'))}
+
+@st.cache_resource(max_entries=TENANT_CACHE_MAX)
+def get_snapshot(folder, stamp):
+    return snapshot.load(folder, stamp)
+
+# === VIEWER MODE: read-only dashboard and catalog from the published snapshot ===
+if VIEWER:
+    meta = snapshot.read_meta(SNAPSHOT_FOLDER)
+    if meta is None: st.info(t('snap_none')); st.stop()
+    snap_inv, snap_sales = get_snapshot(SNAPSHOT_FOLDER, meta['stamp'])
+    st.caption(f"👁️ {t('snap_at')}: {meta['published_at']}")
+    tab_dash, tab_data_ui = st.tabs([t('tab_dash'), t('tab_data')])
+    with tab_dash:
+        st.header(t('dash_header'), help=t('desc_dash'))
+        df = snap_inv.copy()
+        stock_metrics(df)
+        if not snap_sales.empty:
+            prices = df.drop_duplicates('product_id').set_index('product_id')
+            sales = pd.DataFrame({'date': snap_sales['date'].dt.date, 'amount': snap_sales['units']})
+            sales['profit'] = (snap_sales['product_id'].map(prices['sell_price']) - snap_sales['product_id'].map(prices['cost_price'])) * snap_sales['units']
+            sales_panel(sales)
+        if st.button("🔄 Refresh Data"): st.rerun()
+    with tab_data_ui:
+        st.header(t('data_header'), help=t('desc_data'))
+        if st.button(t('refresh')): st.rerun()
+        st.dataframe(snap_inv, column_config={"status": st.column_config.TextColumn("St", width="small"), "thumb": st.column_config.ImageColumn("📸", width="small"), "quantity": st.column_config.ProgressColumn("Qtd", max_value=100), "cost_price": st.column_config.NumberColumn(t('cost'), format="$%.2f"), "sell_price": st.column_config.NumberColumn(t('price'), format="$%.2f")}, use_container_width=True, hide_index=True, column_order=["status", "thumb", "product_id", "product_name", "quantity", "cost_price", "sell_price", "min_stock", "last_updated"])
+        with st.expander(t('reorder_header')):
+            reorder = snap_inv[snap_inv['reorder_qty'] > 0].sort_values('days_cover')
+            if reorder.empty: st.info(t('reorder_none'))
+            else: st.dataframe(reorder[['status', 'product_id', 'product_name', 'quantity', 'min_stock', 'velocity', 'days_cover', 'stockout_date', 'reorder_qty']], column_config=REORDER_COLUMN_CONFIG, use_container_width=True, hide_index=True)
+    st.stop()
+
+tab_dash, tab_scan, tab_gen, tab_data_ui = st.tabs([t('tab_dash'), t('tab_scan'), t('tab_create'), t('tab_data')])
+
+with tab_dash:
+    st.header(t('dash_header'), help=t('desc_dash'))
+    df = load_data()
+    stock_metrics(df)
     if os.path.exists(HISTORY_FILE):
-        hist = pd.read_csv(HISTORY_FILE)
+        hist = inventory_store.read_history(HISTORY_FILE)
         df_prices = df[['product_id', 'cost_price', 'sell_price']]
-        hist['product_id'] = hist['product_id'].astype(str)
         merged = pd.merge(hist, df_prices, on='product_id', how='left')
         sales = merged[merged['action'] == 'SALE'].copy()
         if not sales.empty:
             sales['profit'] = (sales['sell_price'] - sales['cost_price']) * sales['amount']
-            sales['timestamp'] = pd.to_datetime(sales['timestamp']); sales['date'] = sales['timestamp'].dt.date; now = datetime.now().date()
-            st.subheader(t('ana_period'))
-            period_opt = st.selectbox("Selecione:", [t('p_7d'), t('p_30d'), t('p_3m'), t('p_6m'), t('p_1y'), t('p_all')], label_visibility="collapsed")
-            days_map = {t('p_7d'): 7, t('p_30d'): 30, t('p_3m'): 90, t('p_6m'): 180, t('p_1y'): 365, t('p_all'): 36500}
-            days = days_map[period_opt]
-            curr_mask = (sales['date'] > now - timedelta(days=days)) & (sales['date'] <= now)
-            prev_mask = (sales['date'] > now - timedelta(days=days*2)) & (sales['date'] <= now - timedelta(days=days))
-            val_curr = sales[curr_mask]['profit'].sum(); val_prev = sales[prev_mask]['profit'].sum(); delta = val_curr - val_prev
-            st.metric(f"💰 Lucro ({period_opt})", f"${val_curr:,.2f}", delta=f"{delta:,.2f} {t('vs_prev')}")
-            g_tab1, g_tab2, g_tab3 = st.tabs([t('g_daily'), t('g_cum'), t('g_vol')])
-            chart_data = sales[curr_mask].copy()
-            if not chart_data.empty:
-                grouped_day = chart_data.groupby('date')['profit'].sum()
-                grouped_cum = chart_data.groupby('date')['profit'].sum().cumsum()
-                grouped_vol = chart_data.groupby('date')['amount'].sum()
-                with g_tab1: st.bar_chart(grouped_day)
-                with g_tab2: st.line_chart(grouped_cum)
-                with g_tab3: st.area_chart(grouped_vol)
-            else: st.info("Sem dados para este período.")
+            sales['date'] = sales['timestamp'].dt.date
+            sales_panel(sales)
+    with st.expander(t('asof_header')):
+        with st.form("asof_form"):
+            asof_mode = st.radio(t('asof_header'), [t('asof_stock'), t('asof_move')], horizontal=True, label_visibility="collapsed")
+            asof_day = st.date_input(t('asof_at'), value=datetime.now().date())
+            asof_range = st.date_input(t('asof_range'), value=(datetime.now().date() - timedelta(days=30), datetime.now().date()))
+            asof_go = st.form_submit_button(t('asof_run'))
+        if asof_go and os.path.exists(HISTORY_FILE):
+            sh = get_stock_history(HISTORY_FILE, CHECKPOINT_FOLDER); sh.update()
+            if asof_mode == t('asof_stock'):
+                val = sh.valuation_at(asof_day, df)
+                a1, a2, a3 = st.columns(3)
+                a1.metric(t('pieces'), int(val['quantity'].sum()))
+                a2.metric(t('stock_val'), f"${val['stock_value'].sum():,.2f}")
+                a3.metric(t('pot_sales'), f"${val['sales_value'].sum():,.2f}")
+                st.dataframe(val, column_config={"stock_value": st.column_config.NumberColumn(t('stock_val'), format="$%.2f"), "sales_value": st.column_config.NumberColumn(t('pot_sales'), format="$%.2f")}, use_container_width=True, hide_index=True)
+            elif len(asof_range) == 2:
+                mov = sh.movement(asof_range[0], asof_range[1], df)
+                st.dataframe(mov[(mov[stock_history.MOVEMENT_ACTIONS] != 0).any(axis=1)], column_config={"opening": t('opening'), "closing": t('closing')}, use_container_width=True, hide_index=True)
     if st.button("🔄 Refresh Data"): st.rerun()
 
 with tab_scan:
@@ -744,31 +1156,25 @@ with tab_scan:
     c1, c2 = st.columns([1, 2])
     with c1:
         st.write(f"### {t('config_header')}")
-        method = st.radio(t('method'), [t('cam_mode'), t('usb_mode'), t('man_mode')], help=t('h_method'))
+        method = st.radio(t('method'), [t('cam_mode'), t('usb_mode'), t('man_mode'), t('count_mode')], help=t('h_method'))
         mobile = False
         if method == t('cam_mode'): 
             st.write(""); mobile = st.checkbox(t('mobile_compat'), value=True)
         st.markdown("---")
-        mode_label = st.radio(t('action'), [t('act_add'), t('act_remove'), t('act_sell')], help=t('h_action'))
+        mode_label = None
+        if method != t('count_mode'): mode_label = st.radio(t('action'), [t('act_add'), t('act_remove'), t('act_sell')], help=t('h_action'))
         qty = st.number_input(t('qty'), min_value=1, value=1, help=t('h_qty'))
     with c2:
         def update_stock(code):
-            df = pd.read_csv(DATA_FILE); df['product_id'] = df['product_id'].astype(str)
-            if code in df['product_id'].values:
-                row = df.loc[df['product_id'] == code].iloc[0]
-                curr, lim, name = row['quantity'], row['min_stock'], row['product_name']
-                if mode_label == t('act_add'): change = qty; action_code = "ADD"; msg_verb = t('added')
-                elif mode_label == t('act_sell'): change = -qty; action_code = "SALE"; msg_verb = t('sold')
-                else: change = -qty; action_code = "REMOVE"; msg_verb = t('removed')
-                new_q = max(0, curr + change)
-                df.loc[df['product_id'] == code, 'quantity'] = new_q
-                df.loc[df['product_id'] == code, 'last_updated'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                df.to_csv(DATA_FILE, index=False)
-                log_trans(code, name, change, new_q, custom_action=action_code)
-                if new_q <= lim: st.error(f"{t('low_stock')}: {name} ({new_q})!"); st.toast(f"⚠️ {name}", icon="🚨")
-                else: st.toast(f"✅ {msg_verb}: {name} ({new_q})", icon="💰" if action_code == "SALE" else "📦")
-                return True
-            return False
+            if mode_label == t('act_add'): action_code = "ADD"; msg_verb = t('added')
+            elif mode_label == t('act_sell'): action_code = "SALE"; msg_verb = t('sold')
+            else: action_code = "REMOVE"; msg_verb = t('removed')
+            res = inventory_store.apply_movements(DATA_FILE, HISTORY_FILE, [(code, action_code, qty)])[0]
+            if res is None: return False
+            name, new_q = res['product_name'], res['new_total']
+            if res['low_stock']: st.error(f"{t('low_stock')}: {name} ({new_q})!"); st.toast(f"⚠️ {name}", icon="🚨")
+            else: st.toast(f"✅ {msg_verb}: {name} ({new_q})", icon="💰" if action_code == "SALE" else "📦")
+            return True
         if method == t('man_mode'):
             st.info(t('man_mode'))
             df_man = load_data()
@@ -792,6 +1198,38 @@ with tab_scan:
                     if not update_stock(c): st.toast(t('err_not_found'), icon="⚠️")
                     st.session_state.usb_in = ""
             st.text_input(t('input'), key="usb_in", on_change=usb_cb)
+        elif method == t('count_mode'):
+            # Counting session: scans only accumulate in memory until the count is committed
+            label_name = t('count_input')
+            components.html(f"""<script>var input = window.parent.document.querySelector('input[aria-label="{label_name}"]'); if (input) {{ input.focus(); input.addEventListener('blur', function() {{ setTimeout(function(){{ input.focus(); }}, 50); }}); }}</script>""", height=0)
+            if "count_session" not in st.session_state: st.session_state.count_session = {}; st.session_state.count_rev = 0
+            df_cnt = load_data()
+            def count_cb():
+                c = str(st.session_state.count_in).strip()
+                if c:
+                    if c in df_cnt['product_id'].values:
+                        st.session_state.count_session[c] = st.session_state.count_session.get(c, 0) + qty
+                        st.session_state.count_rev += 1  # fresh editor so stale cell edits don't mask the new scan
+                    else: st.toast(t('err_not_found'), icon="⚠️")
+                    st.session_state.count_in = ""
+            st.text_input(label_name, key="count_in", on_change=count_cb)
+            counts = st.session_state.count_session
+            if counts:
+                # Rows keep scan order so editor cell edits stay on the same SKU across reruns
+                diff = df_cnt.set_index('product_id').loc[[c for c in counts if c in df_cnt['product_id'].values], ['product_name', 'quantity']].rename(columns={'quantity': 'expected'}).reset_index()
+                diff['counted'] = diff['product_id'].map(counts).astype(int)
+                diff['diff'] = diff['counted'] - diff['expected']
+                ed_cnt = st.data_editor(diff, column_config={"expected": st.column_config.NumberColumn(t('count_expected')), "counted": st.column_config.NumberColumn(t('count_counted'), min_value=0, step=1), "diff": st.column_config.NumberColumn(t('count_diff'))}, disabled=['product_id', 'product_name', 'expected', 'diff'], hide_index=True, use_container_width=True, key=f"count_editor_{st.session_state.count_rev}")
+                st.session_state.count_session = dict(zip(ed_cnt['product_id'], ed_cnt['counted'].fillna(0).astype(int)))
+                cc1, cc2 = st.columns(2)
+                with cc1:
+                    if st.button(t('count_commit'), type="primary", use_container_width=True):
+                        n = commit_count(st.session_state.count_session)
+                        st.session_state.count_session = {}; st.session_state.count_rev += 1
+                        st.success(f"{t('count_done')} ({n})"); time.sleep(1); st.rerun()
+                with cc2:
+                    if st.button(t('count_reset'), use_container_width=True): st.session_state.count_session = {}; st.session_state.count_rev += 1; st.rerun()
+            else: st.info(t('count_empty'))
         elif mobile:
             st.info(t('take_photo')); img = st.file_uploader("QR", type=['png','jpg','heic','heif'], key="mob", label_visibility="collapsed")
             if img:
@@ -803,11 +1241,24 @@ with tab_scan:
                     else: st.error(t('err_error'))
                 else: st.warning(t('warn_no_qr'))
         else:
+            # Frames are decoded on the shared process pool; recv() only enqueues and overlays the last hit
+            svc = get_decode_service()
+            if 'cam_sid' not in st.session_state: st.session_state.cam_sid = uuid.uuid4().hex
+            cam_sid = st.session_state.cam_sid
             class VideoProcessor:
                 def recv(self, frame):
-                    img = frame.to_ndarray(format="bgr24"); d, _, _ = cv2.QRCodeDetector().detectAndDecode(img)
+                    img = frame.to_ndarray(format="bgr24"); svc.submit(cam_sid, img)
+                    d = svc.last_code(cam_sid, max_age=2)
+                    if d: cv2.putText(img, d, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 200, 0), 2)
                     return av.VideoFrame.from_ndarray(img, format="bgr24")
             webrtc_streamer(key="cam", mode=WebRtcMode.SENDRECV, video_processor_factory=VideoProcessor, async_processing=True)
+            d = svc.last_code(cam_sid)
+            if d:
+                st.info(f"{t('last_read')} {d}")
+                if st.button(t('exec_btn'), key="cam_exec", use_container_width=True):
+                    if not update_stock(d): st.toast(t('err_not_found'), icon="⚠️")
+            cs = svc.stats(cam_sid)
+            if cs: st.caption(f"{t('decode_stats')}: {cs['decoded']}/{cs['submitted']} · {cs['dropped']} drop · {cs['avg_ms']:.0f} ms")
 
 with tab_gen:
     st.header(t('new_item'), help=t('desc_create'))
@@ -909,16 +1360,10 @@ with tab_gen:
                 st.image(PLACEHOLDER_FILE, caption=t('no_img_text'), width='stretch')
         if st.form_submit_button(t('save')):
             if name and pid:
-                df = load_data()
-                if pid in df['product_id'].values: st.error(t('id_exists'))
+                ipath = os.path.join(IMG_FOLDER, f"{pid}.png") if up_img else PLACEHOLDER_FILE
+                if save_edits(added=[{'product_id': pid, 'product_name': name, 'quantity': q, 'min_stock': lim, 'cost_price': cost, 'sell_price': sell, 'image_path': ipath}]): st.error(t('id_exists'))
                 else:
-                    ipath = PLACEHOLDER_FILE
-                    if up_img:
-                        ipath = os.path.join(IMG_FOLDER, f"{pid}.png")
-                        convert_uploaded_image_to_png(up_img, ipath)
-                    qp = os.path.join(QR_FOLDER, f"{pid}.png"); qrcode.make(pid).save(qp)
-                    bp = os.path.join(BARCODE_FOLDER, f"{pid}.png"); barcode.get('code128', pid, writer=ImageWriter()).save(os.path.join(BARCODE_FOLDER, pid))
-                    pd.concat([df, pd.DataFrame([{'product_id': pid, 'product_name': name, 'quantity': q, 'min_stock': lim, 'cost_price': cost, 'sell_price': sell, 'last_updated': datetime.now().strftime("%Y-%m-%d"), 'image_path': ipath, 'qr_path': qp, 'barcode_path': f"{bp}.png"}])], ignore_index=True).to_csv(DATA_FILE, index=False)
+                    if up_img: submit_job('image', src=maintenance.save_upload(IMG_FOLDER, pid, up_img), dest=ipath)
                     st.success(t('saved')); st.session_state.gen_id = str(random.randint(10000000, 99999999)); st.rerun()
     if st.button(t('gen_new_id')): st.session_state.gen_id = str(random.randint(10000000, 99999999)); st.rerun()
 
@@ -926,6 +1371,7 @@ with tab_data_ui:
     st.header(t('data_header'), help=t('desc_data')); 
     if st.button(t('refresh')): st.rerun()
     df = load_data()
+    for err in df.attrs['schema_errors']: st.warning(f"{t('schema_warn')}: {err}")
     with st.expander(t('edit_item'), expanded=False):
         if not df.empty:
             st.info(t('edit_sel'))
@@ -945,25 +1391,34 @@ with tab_data_ui:
                     curr_path = row['image_path']
                     if os.path.exists(curr_path): st.image(curr_path, width=100, caption="Atual")
                     new_img_file = st.file_uploader(t('image'), type=['png','jpg','jpeg','heic','heif'], key="edit_img")
-                if st.form_submit_button(t('save')):
-                    df.loc[df['product_id'] == sel_id, 'product_name'] = new_name
-                    df.loc[df['product_id'] == sel_id, 'quantity'] = new_qty
-                    df.loc[df['product_id'] == sel_id, 'min_stock'] = new_lim
-                    df.loc[df['product_id'] == sel_id, 'cost_price'] = new_cost
-                    df.loc[df['product_id'] == sel_id, 'sell_price'] = new_sell
+                if st.form_submit_button(t('save'), key='edit_save'):  # keyed: the create form has a 'save' button too
+                    cells = {c: v for c, v in [('product_name', new_name), ('quantity', new_qty), ('min_stock', new_lim), ('cost_price', new_cost), ('sell_price', new_sell)] if v != row[c]}
                     if new_img_file:
-                        new_path = os.path.join(IMG_FOLDER, f"{sel_id}.png")
-                        convert_uploaded_image_to_png(new_img_file, new_path)
-                        # Remove old image if it had a different extension
-                        for old in globmod.glob(os.path.join(IMG_FOLDER, f"{sel_id}.*")):
-                            if old != new_path and os.path.exists(old): os.remove(old)
-                        df.loc[df['product_id'] == sel_id, 'image_path'] = new_path
-                    save_data(df); st.success(t('item_updated')); time.sleep(1); st.rerun()
+                        # Converted in the background; the job also removes images with other extensions
+                        cells['image_path'] = os.path.join(IMG_FOLDER, f"{sel_id}.png")
+                        submit_job('image', src=maintenance.save_upload(IMG_FOLDER, sel_id, new_img_file), dest=cells['image_path'])
+                    save_edits({sel_id: cells}); st.success(t('item_updated')); time.sleep(1); st.rerun()
+            ac = get_asset_cache(ASSET_CACHE_FOLDER)
+            fmt = st.radio(t('asset_fmt'), ['png', 'svg'], horizontal=True, format_func=str.upper)
+            dl_qr, dl_bc = st.columns(2)
+            with dl_qr: st.download_button(t('dl_qr'), data=ac.get(sel_id, 'qr', fmt), file_name=f"{sel_id}_qr.{fmt}", mime=assets.MIME[fmt], use_container_width=True)
+            with dl_bc: st.download_button(t('dl_barcode'), data=ac.get(sel_id, 'code128', fmt), file_name=f"{sel_id}_barcode.{fmt}", mime=assets.MIME[fmt], use_container_width=True)
+            st.markdown(f"**{t('timeline')}**")
+            tl_n = st.radio(t('timeline_n'), [20, 100, 500], horizontal=True)
+            hidx = get_history_index(HISTORY_FILE).refresh()
+            tl, tl_sum = hidx.timeline(sel_id, tl_n), hidx.summary(sel_id)
+            tm1, tm2, tm3 = st.columns(3)
+            tm1.metric(t('timeline_moves'), tl_sum['movements'])
+            tm2.metric(t('timeline_sold'), tl_sum['sold'])
+            tm3.metric(t('timeline_revenue'), f"${tl_sum['sold'] * float(row['sell_price']):,.2f}")
+            if tl.empty: st.caption(t('timeline_empty'))
+            else:
+                st.line_chart(tl.set_index('timestamp')['new_total'], height=160)
+                st.dataframe(tl.iloc[::-1][['timestamp', 'action', 'amount', 'new_total']], column_config={"timestamp": st.column_config.DatetimeColumn(t('timeline_when')), "new_total": st.column_config.NumberColumn(t('timeline_stock'))}, use_container_width=True, hide_index=True, height=240)
             col_regen, col_del = st.columns(2)
             with col_regen:
                 if st.button(t('regen_assets'), use_container_width=True):
-                    qp = os.path.join(QR_FOLDER, f"{sel_id}.png"); qrcode.make(sel_id).save(qp)
-                    bp = os.path.join(BARCODE_FOLDER, f"{sel_id}.png"); barcode.get('code128', sel_id, writer=ImageWriter()).save(os.path.join(BARCODE_FOLDER, sel_id))
+                    ac.forget(sel_id)  # rendered again on demand by the table below
                     st.success(t('assets_ok')); time.sleep(1); st.rerun()
             with col_del:
                 if st.button(t('delete_item'), type="primary", use_container_width=True):
@@ -974,8 +1429,7 @@ with tab_data_ui:
                 with cd1:
                     if st.button("✅ Confirm", key="del_yes", use_container_width=True):
                         # Delete from CSV
-                        df = df[df['product_id'] != sel_id]
-                        save_data(df)
+                        save_edits(deleted=[sel_id])
                         # Delete associated files
                         for pattern in [os.path.join(IMG_FOLDER, f"{sel_id}.*"),
                                         os.path.join(QR_FOLDER, f"{sel_id}.png"),
@@ -990,14 +1444,43 @@ with tab_data_ui:
         else: st.warning("Sem produtos.")
     disp = df.copy()
     disp['img_d'] = disp['image_path'].apply(path_to_image_html)
-    disp['qr_d'] = disp['qr_path'].apply(path_to_image_html)
-    disp['bc_d'] = disp['barcode_path'].apply(path_to_image_html)
-    disp['Status'] = disp['quantity'].apply(lambda x: "🟢" if x>=25 else "🟡" if x>=5 else "🔴")
-    ed = st.data_editor(disp, column_config={"Status": st.column_config.TextColumn("St", width="small"), "img_d": st.column_config.ImageColumn("📸", width="small"), "qr_d": st.column_config.ImageColumn("QR", width="small"), "bc_d": st.column_config.ImageColumn("Bar", width="medium"), "quantity": st.column_config.ProgressColumn("Qtd", max_value=100), "cost_price": st.column_config.NumberColumn(t('cost'), format="$%.2f"), "sell_price": st.column_config.NumberColumn(t('price'), format="$%.2f"), "image_path": None, "qr_path": None, "barcode_path": None, "display_label": None}, use_container_width=True, num_rows="dynamic", key="editor", column_order=["Status", "img_d", "product_id", "product_name", "quantity", "cost_price", "sell_price", "min_stock", "qr_d", "bc_d"])
+    ac = get_asset_cache(ASSET_CACHE_FOLDER)
+    disp['qr_d'] = disp['product_id'].apply(lambda c: ac.data_uri(c, 'qr', box_size=3, border=2))
+    disp['bc_d'] = disp['product_id'].apply(lambda c: ac.data_uri(c, 'code128', module_height=8.0, font_size=6))
+    fc = stock_forecast(df)
+    disp['Status'] = fc['status']
+    ed = st.data_editor(disp, column_config={"Status": st.column_config.TextColumn("St", width="small"), "img_d": st.column_config.ImageColumn("📸", width="small"), "qr_d": st.column_config.ImageColumn("QR", width="small"), "bc_d": st.column_config.ImageColumn("Bar", width="medium"), "quantity": st.column_config.ProgressColumn("Qtd", max_value=100), "cost_price": st.column_config.NumberColumn(t('cost'), format="$%.2f"), "sell_price": st.column_config.NumberColumn(t('price'), format="$%.2f"), "image_path": None, "qr_path": None, "barcode_path": None, "display_label": None}, use_container_width=True, num_rows="dynamic", key=f"editor_{st.session_state.get('editor_rev', 0)}", column_order=["Status", "img_d", "product_id", "product_name", "quantity", "cost_price", "sell_price", "min_stock", "qr_d", "bc_d"])
     if not disp.equals(ed):
-        for c in ['product_name', 'quantity', 'min_stock', 'cost_price', 'sell_price']: df[c] = ed[c]
-        if len(df) != len(ed): save_data(ed.drop(columns=['img_d','qr_d','bc_d','Status', 'display_label']))
-        else: save_data(df)
+        # Only the edited cells, added and deleted rows are written, keyed by product_id
+        edits = st.session_state[f"editor_{st.session_state.get('editor_rev', 0)}"]
+        ids = disp['product_id'].tolist()
+        updates = {ids[i]: {c: v for c, v in cells.items() if c in ['product_name', 'quantity', 'min_stock', 'cost_price', 'sell_price']} for i, cells in edits['edited_rows'].items()}
+        added = [{c: r.get(c) for c in EXPECTED_COLS if c in r} for r in edits['added_rows']]
+        save_edits(updates, added, [ids[i] for i in edits['deleted_rows']])
+        st.session_state.editor_rev = st.session_state.get('editor_rev', 0) + 1  # fresh editor: stale cell edits must not be written again
         st.toast(t('saved'), icon="💾"); time.sleep(0.5); st.rerun()
+    with st.expander(t('reorder_header')):
+        reorder = pd.concat([df[['product_id', 'product_name', 'quantity', 'min_stock']], fc.drop(columns=['product_id'])], axis=1)
+        reorder = reorder[reorder['reorder_qty'] > 0].sort_values('days_cover')
+        if reorder.empty: st.info(t('reorder_none'))
+        else: st.dataframe(reorder[['status', 'product_id', 'product_name', 'quantity', 'min_stock', 'velocity', 'days_cover', 'stockout_date', 'reorder_qty']], column_config=REORDER_COLUMN_CONFIG, use_container_width=True, hide_index=True)
+    with st.expander(t('report_header')):
+        with st.form("report_form"):
+            r1, r2, r3 = st.columns(3)
+            rep_kind = r1.selectbox(t('report_kind'), ['valuation', 'sales', 'movements'], format_func=lambda k: t(f"report_{k}"))
+            rep_period = r2.selectbox(t('ana_period'), list(PERIOD_DAYS), format_func=t)
+            rep_by = r3.selectbox(t('report_by'), ['product', 'day', 'month'], format_func=lambda k: t(f"by_{k}"))
+            rep_fmt = st.radio(t('asset_fmt'), reports.FORMATS, horizontal=True, format_func=str.upper)
+            rep_go = st.form_submit_button(t('report_run'))
+        if rep_go:
+            start, end = reports.period_range(PERIOD_DAYS[rep_period]) if rep_period != 'p_all' else (None, None)
+            def build_report(kind=rep_kind, fmt=rep_fmt, start=start, end=end, by=rep_by):
+                # Called by Streamlit only when the download is clicked; written to a temp file, read once
+                with tempfile.TemporaryFile() as rep_out:
+                    if kind == 'valuation': reports.export_valuation(DATA_FILE, rep_out, fmt)
+                    elif kind == 'sales': reports.export_sales(DATA_FILE, HISTORY_FILE, rep_out, start, end, by=by, fmt=fmt)
+                    else: reports.export_movements(HISTORY_FILE, rep_out, start, end, fmt=fmt)
+                    rep_out.seek(0); return rep_out.read()
+            st.download_button(t('report_download'), data=build_report, file_name=f"quantix_{rep_kind}_{datetime.now().strftime('%Y%m%d')}.{rep_fmt}", mime=reports.MIME[rep_fmt], on_click='ignore')
     with st.expander(t('hist_header')):
-        if os.path.exists(HISTORY_FILE): st.dataframe(pd.read_csv(HISTORY_FILE).sort_values('timestamp', ascending=False), use_container_width=True)
\ No newline at end of file
+        if os.path.exists(HISTORY_FILE): st.dataframe(inventory_store.read_history(HISTORY_FILE).sort_values('timestamp', ascending=False), use_container_width=True)
\ No newline at end of file
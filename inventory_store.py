@@ -0,0 +1,270 @@
+# ==============================================================================
+# COPYRIGHT NOTICE & LICENSE TERMS
+# ==============================================================================
+#  Software: QUANTIX Inventory System
+#  Owner:    Wildfire Consulting Services LLC
+#  Author:   Joao de Mendonca Salim
+#  Copyright (c) 2026 Wildfire Consulting Services LLC. All Rights Reserved.
+#
+#  LICENSE TERMS:
+#  This software is provided under a revocable, non-exclusive, non-transferable
+#  free license granted by Wildfire Consulting Services LLC.
+# ==============================================================================
+"""Stock movement semantics shared by the Streamlit app and the HTTP API.
+
+All writers take an inter-process lock on inventory.csv and replace it
+atomically, so the app and api_server.py can run side by side. Every write
+is a read-modify-write under that lock; the app's catalog edits go through
+apply_edits, which changes only the edited cells, so a movement committed
+while a page was open is never reverted.
+"""
+
+import csv
+import io
+import os
+from datetime import datetime
+
+import pandas as pd
+
+HISTORY_COLS = ['timestamp', 'product_id', 'product_name', 'action', 'amount', 'new_total']
+ACTION_SIGN = {'ADD': 1, 'REMOVE': -1, 'SALE': -1}
+# Counts (ADJUST) and sync imports (SYNC) can go either way: their history amount is the signed change
+SIGNED_ACTIONS = ('ADJUST', 'SYNC')
+TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Column types applied on every read. Catalog strings stay plain (they are edited in
+# place); quantities are int32, money is rounded to whole cents, timestamps are parsed.
+# History strings repeat on every row, so they are categorical.
+INVENTORY_COLS = ['product_id', 'product_name', 'quantity', 'min_stock', 'cost_price', 'sell_price', 'last_updated', 'image_path']
+QTY_COLS = ['quantity', 'min_stock']
+MONEY_COLS = ['cost_price', 'sell_price']
+# image_path as str also keeps an all-empty column from being read back as float (assigning a path then fails)
+INVENTORY_DTYPES = {'product_id': str, 'product_name': str, 'image_path': str}
+# history.csv.idx: one "offset,length,product_id,action,amount" line per history row,
+# appended together with the row; history_index.py turns it into per-product lookups
+INDEX_SUFFIX = '.idx'
+INDEX_COLS = ['offset', 'length', 'product_id', 'action', 'amount']
+HISTORY_DTYPES = {'timestamp': str, 'product_id': 'category', 'product_name': 'category', 'action': 'category'}
+
+
+class FileLock:
+    """Exclusive lock on `<path>.lock`, held across processes (and threads)."""
+
+    def __init__(self, path):
+        self.path = path + '.lock'
+
+    def __enter__(self):
+        self._f = open(self.path, 'a+b')
+        if os.name == 'nt':
+            import msvcrt
+            while True:
+                try:
+                    self._f.seek(0); msvcrt.locking(self._f.fileno(), msvcrt.LK_LOCK, 1); break
+                except OSError: continue  # LK_LOCK gives up after ~10 s; keep waiting
+        else:
+            import fcntl
+            fcntl.flock(self._f, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if os.name == 'nt':
+            import msvcrt
+            self._f.seek(0); msvcrt.locking(self._f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self._f, fcntl.LOCK_UN)
+        self._f.close()
+
+
+def now_str():
+    return datetime.now().strftime(TS_FORMAT)
+
+
+def _timestamps(s):
+    ts = pd.to_datetime(s, format=TS_FORMAT, errors='coerce')
+    other = ts.isna() & s.notna()
+    if other.any(): ts[other] = pd.to_datetime(s[other], errors='coerce')  # e.g. date-only values
+    return ts
+
+
+def apply_schema(df):
+    """Type a raw catalog frame (modified in place) and list its problems in df.attrs['schema_errors'].
+
+    Missing columns are added with defaults (listed in df.attrs['added_cols']);
+    unreadable numbers become 0 and unreadable dates NaT.
+    """
+    errors = []
+    added = [c for c in INVENTORY_COLS if c not in df.columns]
+    for c in added: df[c] = 0 if c in QTY_COLS + MONEY_COLS else None
+    ids = df['product_id']
+    if ids.isna().any() or (ids.astype(str).str.strip() == '').any(): errors.append("product_id has empty values")
+    dup = ids.dropna().astype(str).duplicated()
+    if dup.any(): errors.append(f"product_id has duplicated values ({int(dup.sum())} rows)")
+    df['product_id'] = ids.fillna('').astype(str)
+    for c in QTY_COLS + MONEY_COLS:
+        num = pd.to_numeric(df[c], errors='coerce')
+        bad = num.isna() & df[c].notna()
+        if bad.any(): errors.append(f"{c} has non-numeric values ({int(bad.sum())} rows)")
+        if (num < 0).any(): errors.append(f"{c} has negative values ({int((num < 0).sum())} rows)")
+        num = num.fillna(0)
+        if c in QTY_COLS:
+            if (num % 1 != 0).any(): errors.append(f"{c} has fractional values ({int((num % 1 != 0).sum())} rows)")
+            df[c] = num.round().astype('int32')
+        else:
+            df[c] = num.mul(100).round().astype('int64') / 100  # whole cents, no float drift from edits
+    raw = df['last_updated']
+    df['last_updated'] = _timestamps(raw.astype(str).where(raw.notna()))
+    bad = df['last_updated'].isna() & raw.notna()
+    if bad.any(): errors.append(f"last_updated has unreadable dates ({int(bad.sum())} rows)")
+    df.attrs['schema_errors'], df.attrs['added_cols'] = errors, added
+    return df
+
+
+def validate_inventory(df):
+    """Problems in a raw catalog frame as readable messages; [] when clean."""
+    return apply_schema(df.copy()).attrs['schema_errors']
+
+
+def read_inventory(data_file):
+    return apply_schema(pd.read_csv(data_file, dtype=INVENTORY_DTYPES))
+
+
+def read_history(history_file):
+    """history.csv with categorical strings, int32 amounts and parsed timestamps."""
+    df = pd.read_csv(history_file, dtype=HISTORY_DTYPES)
+    df['timestamp'] = _timestamps(df['timestamp'])
+    for c in ['amount', 'new_total']: df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0).astype('int32')
+    return df
+
+
+def _replace_csv(df, data_file):
+    tmp = f"{data_file}.{os.getpid()}.tmp"
+    df.to_csv(tmp, index=False, date_format=TS_FORMAT)
+    os.replace(tmp, data_file)
+
+
+def write_inventory(data_file, df):
+    with FileLock(data_file): _replace_csv(df, data_file)
+
+
+def history_tail(history_file, offset):
+    """The bytes just before `offset`. Readers that follow history.csv by offset keep them to notice the
+    file was replaced (restore) even after it has grown past their offset again; None if unreadable."""
+    if offset == 0: return ''
+    try:
+        with open(history_file, 'rb') as f:
+            start = max(0, offset - 64); f.seek(start); return f.read(offset - start).decode('utf-8', 'replace')
+    except OSError:
+        return None
+
+
+def csv_line(values):
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator='\n').writerow(values)
+    return buf.getvalue().encode('utf-8')
+
+
+def log_trans_many(history_file, records):
+    """Append several (pid, name, change, total, action) records in a single write, plus their index entries.
+
+    The index is only extended when it already exists (or the history is new);
+    otherwise history_index.py builds it from scratch on first use.
+    """
+    if not records: return
+    ts = now_str()
+    rows = [[ts, pid, name, action, change if action in SIGNED_ACTIONS else abs(change), total] for pid, name, change, total, action in records]
+    lines = [csv_line(r) for r in rows]
+    index_file = history_file + INDEX_SUFFIX
+    with FileLock(history_file):
+        new = not os.path.exists(history_file)
+        with open(history_file, 'ab') as f:
+            if new: f.write(csv_line(HISTORY_COLS))
+            pos = f.tell()
+            f.write(b''.join(lines))
+        if new or os.path.exists(index_file):
+            entries = []
+            for r, line in zip(rows, lines):
+                entries.append(csv_line([pos, len(line), r[1], r[3], r[4]])); pos += len(line)
+            with open(index_file, 'wb' if new else 'ab') as f: f.write(b''.join(entries))
+
+
+def apply_movements(data_file, history_file, movements):
+    """Apply (product_id, action, qty) movements in order with one inventory write and one history append.
+
+    Stock never goes below zero. Returns one result dict per movement
+    (product_id, product_name, action, change, new_total, min_stock, low_stock)
+    or None for unknown product ids.
+    """
+    with FileLock(data_file):
+        df = read_inventory(data_file)
+        pos = {pid: i for i, pid in enumerate(df['product_id'])}
+        qty = df['quantity'].to_numpy(dtype='int64')
+        touched, records, results = set(), [], []
+        for pid, action, amount in movements:
+            i = pos.get(str(pid))
+            if i is None: results.append(None); continue
+            change = ACTION_SIGN[action] * int(amount)
+            qty[i] = max(0, qty[i] + change); touched.add(i)
+            name, lim = df.at[i, 'product_name'], df.at[i, 'min_stock']
+            records.append((str(pid), name, change, int(qty[i]), action))
+            results.append({'product_id': str(pid), 'product_name': name, 'action': action, 'change': change, 'new_total': int(qty[i]), 'min_stock': int(lim), 'low_stock': bool(qty[i] <= lim)})
+        if records:
+            df['quantity'] = qty.astype('int32')
+            df.loc[sorted(touched), 'last_updated'] = pd.Timestamp(now_str())
+            _replace_csv(df, data_file)
+            log_trans_many(history_file, records)
+    return results
+
+
+def apply_counts(data_file, history_file, counts):
+    """Set counted quantities ({product_id: qty}); one write and one ADJUST record per changed SKU."""
+    with FileLock(data_file):
+        df = read_inventory(data_file)
+        now = pd.Timestamp(now_str()); records = []
+        for pid, counted in counts.items():
+            mask = df['product_id'] == pid
+            if not mask.any(): continue
+            row = df.loc[mask].iloc[0]
+            change = int(counted) - int(row['quantity'])
+            if change == 0: continue
+            df.loc[mask, 'quantity'] = int(counted); df.loc[mask, 'last_updated'] = now
+            records.append((pid, row['product_name'], change, int(counted), "ADJUST"))
+        if records:
+            _replace_csv(df, data_file)
+            log_trans_many(history_file, records)
+    return len(records)
+
+
+def _cell(col, value):
+    if col in QTY_COLS: return 0 if pd.isna(value) else int(round(float(value)))
+    if col in MONEY_COLS: return 0.0 if pd.isna(value) else round(float(value), 2)
+    return value
+
+
+def apply_edits(data_file, updates=None, added=(), deleted=()):
+    """Catalog edits from the app as one locked read-modify-write of only the changed cells.
+
+    updates: {product_id: {column: value}}; added: new row dicts; deleted: product ids.
+    Movements written by others since the app read the file are kept. Returns
+    the ids of added rows that already exist (those rows are not added).
+    """
+    with FileLock(data_file):
+        df = read_inventory(data_file) if os.path.exists(data_file) else apply_schema(pd.DataFrame(columns=INVENTORY_COLS))
+        now = pd.Timestamp(now_str())
+        for pid, cells in (updates or {}).items():
+            mask = df['product_id'] == pid
+            if not mask.any() or not cells: continue
+            for col, value in cells.items(): df.loc[mask, col] = _cell(col, value)
+            df.loc[mask, 'last_updated'] = now
+        if deleted: df = df[~df['product_id'].isin(list(deleted))]
+        ids = set(df['product_id'])
+        exists = [r['product_id'] for r in added if r.get('product_id') and r['product_id'] in ids]
+        new = [dict(r, last_updated=r.get('last_updated', now)) for r in added if r.get('product_id') not in exists]
+        if new: df = pd.concat([df, apply_schema(pd.DataFrame(new, columns=INVENTORY_COLS))], ignore_index=True)
+        _replace_csv(df, data_file)
+    return exists
+
+
+def low_stock(data_file):
+    df = read_inventory(data_file)
+    return df[df['quantity'] <= df['min_stock']]
@@ -0,0 +1,110 @@
+# ==============================================================================
+# COPYRIGHT NOTICE & LICENSE TERMS
+# ==============================================================================
+#  Software: QUANTIX Inventory System
+#  Owner:    Wildfire Consulting Services LLC
+#  Author:   Joao de Mendonca Salim
+#  Copyright (c) 2026 Wildfire Consulting Services LLC. All Rights Reserved.
+#
+#  LICENSE TERMS:
+#  This software is provided under a revocable, non-exclusive, non-transferable
+#  free license granted by Wildfire Consulting Services LLC.
+# ==============================================================================
+"""Background jobs: persisted, deduplicated by key, run on a bounded thread pool.
+
+A job is a handler name plus JSON parameters, so it can be written to
+jobs.json and picked up again after a restart (queued and interrupted jobs
+are re-run). Handlers are plain functions `handler(progress, **params)`
+that call progress(fraction, message) and may return a short result text.
+Submitting a job whose key matches a queued or running one returns that job
+instead of starting a second copy.
+
+There is one runner per data folder in the server process; its state file
+is not shared with other processes.
+"""
+
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import inventory_store
+
+ACTIVE = ('queued', 'running')
+KEEP_FINISHED = 50
+SAVE_EVERY = 0.5  # seconds between progress writes to jobs.json
+
+
+def make_pool(workers=2):
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="quantix-job")
+
+
+class JobRunner:
+    def __init__(self, state_file, handlers, pool):
+        self.state_file, self.handlers, self.pool = state_file, handlers, pool
+        self._lock = threading.Lock()
+        self._jobs, self._saved = [], 0.0
+        try:
+            with open(state_file, 'r', encoding='utf-8') as f: self._jobs = json.load(f)['jobs']
+        except (OSError, ValueError, KeyError): pass
+        for job in self._jobs:
+            if job['status'] in ACTIVE:  # interrupted by a restart: run again
+                job.update(status='queued', progress=0.0, message='')
+                self.pool.submit(self._run, job['id'])
+        self._save()
+
+    def _save(self):
+        tmp = f"{self.state_file}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f: json.dump({'jobs': self._jobs}, f)
+        os.replace(tmp, self.state_file)
+        self._saved = time.monotonic()
+
+    def _find(self, job_id):
+        return next(j for j in self._jobs if j['id'] == job_id)
+
+    def submit(self, kind, key=None, **params):
+        """Queue `kind` with `params`; returns the job id (of the running one if `key` is already active)."""
+        if kind not in self.handlers: raise ValueError(f"Unknown job kind: {kind}")
+        with self._lock:
+            if key is not None:
+                for job in self._jobs:
+                    if job['key'] == key and job['status'] in ACTIVE: return job['id']
+            job = {'id': uuid.uuid4().hex, 'kind': kind, 'key': key, 'params': params, 'status': 'queued', 'progress': 0.0,
+                   'message': '', 'created': inventory_store.now_str(), 'finished': None}
+            self._jobs.append(job)
+            self._save()
+        self.pool.submit(self._run, job['id'])
+        return job['id']
+
+    def _update(self, job_id, force=False, **fields):
+        with self._lock:
+            self._find(job_id).update(fields)
+            if force or time.monotonic() - self._saved >= SAVE_EVERY: self._save()
+
+    def _run(self, job_id):
+        with self._lock: job = dict(self._find(job_id))
+        self._update(job_id, force=True, status='running')
+        progress = lambda frac, message='': self._update(job_id, progress=round(min(max(frac, 0.0), 1.0), 3), message=message)
+        try:
+            result = self.handlers[job['kind']](progress, **job['params'])
+            fields = {'status': 'done', 'progress': 1.0, 'message': result or ''}
+        except Exception as e:
+            traceback.print_exc()
+            fields = {'status': 'failed', 'message': str(e) or type(e).__name__}
+        with self._lock:
+            self._find(job_id).update(fields, finished=inventory_store.now_str())
+            done = [j for j in self._jobs if j['status'] not in ACTIVE]
+            for old in done[:-KEEP_FINISHED]: self._jobs.remove(old)
+            self._save()
+
+    def jobs(self, active_only=False, limit=10):
+        """Newest first, as copies."""
+        with self._lock:
+            return [dict(j) for j in reversed(self._jobs) if not active_only or j['status'] in ACTIVE][:limit]
+
+    def get(self, job_id):
+        with self._lock:
+            return next((dict(j) for j in self._jobs if j['id'] == job_id), None)
@@ -0,0 +1,250 @@
+# ==============================================================================
+# COPYRIGHT NOTICE & LICENSE TERMS
+# ==============================================================================
+#  Software: QUANTIX Inventory System
+#  Owner:    Wildfire Consulting Services LLC
+#  Author:   Joao de Mendonca Salim
+#  Copyright (c) 2026 Wildfire Consulting Services LLC. All Rights Reserved.
+#
+#  LICENSE TERMS:
+#  This software is provided under a revocable, non-exclusive, non-transferable
+#  free license granted by Wildfire Consulting Services LLC.
+# ==============================================================================
+"""Load and soak test: N simulated sessions driving the real inventory_app.py.
+
+Each session is a headless Streamlit session (streamlit.testing AppTest) in
+its own process, since AppTest keeps one runtime per process; sessions contend
+on the shared inventory.csv / history.csv exactly as browser tabs do, but do
+not share cached resources. They run against a throwaway data folder with a
+synthetic catalog and a local stand-in for the license list, mixing USB scans,
+manual sells, item edits and plain dashboard reruns.
+
+    python loadtest.py [--sessions 8] [--actions 50] [--products 200]
+    python loadtest.py --sessions 4 --duration 3600 --sample 60     # soak
+
+Reports p50/p95/p99 rerun latency per action, throughput, lost updates (final
+quantity vs the sum of applied movements) and process memory over time
+(current RSS with psutil installed, otherwise peak RSS).
+"""
+
+import argparse
+import ast
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import requests
+
+import inventory_store
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'inventory_app.py')
+LICENSE_KEY = 'LOADTEST-0000-0000'
+START_QTY = 1000000  # high enough that SALE/REMOVE never clamp at zero, so every movement is countable
+DEFAULT_MIX = 'usb=50,manual=20,edit=10,view=20'
+
+# Current RSS needs psutil (pip install psutil); without it the getrusage fallback only
+# reports the peak, which never goes down, so the report says which one it measured
+try:
+    import psutil
+    RSS_KIND = 'RSS'
+    def rss_mb(): return psutil.Process().memory_info().rss / 1048576
+except ImportError:
+    RSS_KIND = 'peak RSS'
+    try:
+        import resource
+        def rss_mb(): return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+    except ImportError:
+        def rss_mb(): return float('nan')
+
+
+def _app_constants():
+    """LANG and LICENSE_MASTER_URL from inventory_app.py, without running the script."""
+    tree = ast.parse(open(APP_FILE, encoding='utf-8').read())
+    found = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and isinstance(node.targets[0], ast.Name) and node.targets[0].id in ('LANG', 'LICENSE_MASTER_URL'):
+            found[node.targets[0].id] = ast.literal_eval(node.value)
+    return found['LANG']['PT'], found['LICENSE_MASTER_URL']  # AppTest formats options outside the session, i.e. in the default language
+
+
+def license_stub():
+    """Local server answering like the license gist; returns (server, base_url)."""
+    body = json.dumps({LICENSE_KEY: 'ACTIVE'}).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers(); self.wfile.write(body)
+
+        def log_message(self, *args): pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/licenses.json"
+
+
+def route_license(master_url, stub_url):
+    """Send check_license() requests to the stub; everything else goes out unchanged."""
+    real_get = requests.get
+    def get(url, *args, **kwargs):
+        if str(url).startswith(master_url): url = stub_url + str(url)[len(master_url):]
+        return real_get(url, *args, **kwargs)
+    requests.get = get
+
+
+def make_root(products):
+    root = tempfile.mkdtemp(prefix="quantix_load_")
+    with open(os.path.join(root, 'config.json'), 'w') as f: json.dump({'company_name': 'Load Test', 'license_key': LICENSE_KEY}, f)
+    pd.DataFrame({
+        'product_id': [f"SKU-{i:05d}" for i in range(products)], 'product_name': [f"Product {i}" for i in range(products)],
+        'quantity': START_QTY, 'min_stock': 5, 'cost_price': 2.5, 'sell_price': 4.0, 'last_updated': inventory_store.now_str(), 'image_path': None,
+    }).to_csv(os.path.join(root, 'inventory.csv'), index=False)
+    return root
+
+
+class Session:
+    """One simulated phone/tablet: a headless AppTest plus the movements it applied."""
+
+    def __init__(self, n, tr, ids, stats):
+        from streamlit.testing.v1 import AppTest
+        self.rnd, self.tr, self.ids, self.stats = random.Random(n), tr, ids, stats
+        self.at = AppTest.from_file(APP_FILE, default_timeout=120)
+        self._run('view', self.at.run)
+
+    def _run(self, kind, fn):
+        t0 = time.perf_counter()
+        fn()
+        self.stats.record(kind, time.perf_counter() - t0, len(self.at.exception))
+
+    def _radio(self, option):
+        return next(r for r in self.at.radio if option in r.options)
+
+    def _set_mode(self, method, action):
+        if self._radio(self.tr['usb_mode']).value != method: self._run('setup', self._radio(self.tr['usb_mode']).set_value(method).run)
+        if self._radio(self.tr['act_add']).value != action: self._run('setup', self._radio(self.tr['act_add']).set_value(action).run)
+
+    def step(self, kind):
+        tr, pid = self.tr, self.rnd.choice(self.ids)
+        if kind == 'usb':
+            add = self.rnd.random() < 0.3
+            self._set_mode(tr['usb_mode'], tr['act_add'] if add else tr['act_sell'])
+            self._run('usb', self.at.text_input(key='usb_in').set_value(pid).run)
+            self.stats.moved(pid, 1 if add else -1)
+        elif kind == 'manual':
+            self._set_mode(tr['man_mode'], tr['act_sell'])
+            sel = next(s for s in self.at.selectbox if s.label == tr['sel_prod'])
+            label = next(o for o in sel.options if o.endswith(f"({pid})"))
+            if sel.value != label: self._run('setup', sel.set_value(label).run)
+            self._run('manual', next(b for b in self.at.button if b.label == tr['exec_btn']).click().run)
+            self.stats.moved(pid, -1)
+        elif kind == 'edit':
+            # Edit panel: change the alert level only, so any quantity drift is a lost movement
+            sel = next(s for s in self.at.selectbox if s.label == 'Product')
+            label = next(o for o in sel.options if o.endswith(f"({pid})"))
+            if sel.value != label: self._run('setup', sel.set_value(label).run)
+            lim = [n for n in self.at.number_input if n.label == tr['min_alert']][-1]  # the create form has one too
+            new_lim = self.rnd.randint(1, 20)
+            lim.set_value(new_lim)
+            self._run('edit', self.at.button(key='edit_save').click().run)
+            saved = inventory_store.read_inventory('inventory.csv').set_index('product_id').at[pid, 'min_stock']
+            if saved != new_lim: raise AssertionError(f"edit of {pid} not saved: min_stock {saved}, expected {new_lim}")
+        else:
+            self._run('view', self.at.run)
+
+
+class Stats:
+    def __init__(self):
+        self.latency, self.errors, self.expected, self.memory = {}, 0, {}, []
+
+    def record(self, kind, seconds, errors):
+        self.latency.setdefault(kind, []).append(seconds); self.errors += errors
+
+    def failed(self, kind, error):
+        self.errors += 1
+        if self.errors <= 3: print(f"  {kind} failed: {error!r}", file=sys.stderr)
+
+    def moved(self, pid, change):
+        self.expected[pid] = self.expected.get(pid, 0) + change
+
+
+def _session_proc(n, root, products, actions, duration, mix, sample, master_url, stub_url):
+    """One session in its own process (AppTest keeps a per-process runtime); returns its Stats as a dict."""
+    sys.path.insert(0, os.path.dirname(APP_FILE))
+    os.chdir(root)  # the app resolves its data folder relative to the working directory
+    route_license(master_url, stub_url)
+    tr, _ = _app_constants()
+    ids = [f"SKU-{i:05d}" for i in range(products)]
+    kinds, weights = zip(*[(k, float(w)) for k, w in (part.split('=') for part in mix.split(','))])
+    stats, start, i = Stats(), time.perf_counter(), 0
+    stats.memory.append((0.0, rss_mb()))
+    s = Session(n, tr, ids, stats)
+    while (time.perf_counter() - start < duration) if duration else i < actions:
+        kind = s.rnd.choices(kinds, weights)[0]; i += 1
+        try: s.step(kind)
+        except Exception as e:  # a widget went missing after a failed rerun: count it and reconnect
+            stats.failed(kind, e); s = Session(n, tr, ids, stats)
+        if time.perf_counter() - start - stats.memory[-1][0] >= sample: stats.memory.append((time.perf_counter() - start, rss_mb()))
+    stats.memory.append((time.perf_counter() - start, rss_mb()))
+    return vars(stats)
+
+
+def _pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+
+def run(sessions, actions, products, mix, duration=None, sample=30, keep=False):
+    _, master_url = _app_constants()
+    stub, stub_url = license_stub()
+    root = make_root(products)
+    try:
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=sessions, mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = [pool.submit(_session_proc, n, root, products, actions, duration, mix, sample, master_url, stub_url) for n in range(sessions)]
+            results = [f.result() for f in futures]
+        elapsed = time.perf_counter() - start
+
+        latency, expected = {}, {}
+        for r in results:
+            for kind, vals in r['latency'].items(): latency.setdefault(kind, []).extend(vals)
+            for pid, d in r['expected'].items(): expected[pid] = expected.get(pid, 0) + d
+        final = inventory_store.read_inventory(os.path.join(root, 'inventory.csv')).set_index('product_id')['quantity']
+        lost = sum(abs(int(final.get(pid, START_QTY)) - (START_QTY + d)) for pid, d in expected.items())
+        moves = sum(len(latency.get(k, [])) for k in ('usb', 'manual'))
+        print(f"{sessions} sessions, {elapsed:.1f}s, mix {mix}")
+        for kind, vals in sorted(latency.items()):
+            print(f"  {kind:<7} n={len(vals):<6} p50={_pct(vals, .5):7.0f}ms p95={_pct(vals, .95):7.0f}ms p99={_pct(vals, .99):7.0f}ms")
+        print(f"throughput {sum(map(len, latency.values())) / elapsed:.1f} reruns/s, {moves / elapsed:.1f} movements/s")
+        print(f"lost updates {lost} units of {sum(abs(d) for d in expected.values())} net moved; catalog rows {len(final)}/{products}; script errors {sum(r['errors'] for r in results)}")
+        first, last = sum(r['memory'][0][1] for r in results), sum(r['memory'][-1][1] for r in results)
+        # growth after the first sample past warm-up (first full rerun), summed over sessions
+        rate = sum((r['memory'][-1][1] - r['memory'][1][1]) / (r['memory'][-1][0] - r['memory'][1][0]) * 3600 for r in results if len(r['memory']) > 2 and r['memory'][-1][0] > r['memory'][1][0])
+        print(f"memory ({RSS_KIND}) {first:.0f} MB -> {last:.0f} MB across sessions" + (f" ({rate:+.1f} MB/h after warm-up)" if duration else ""))
+    finally:
+        stub.shutdown()
+        if keep: print(f"data kept in {root}")
+        else: shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="QUANTIX concurrent-session load / soak test")
+    parser.add_argument('--sessions', type=int, default=8)
+    parser.add_argument('--actions', type=int, default=50, help="actions per session (ignored with --duration)")
+    parser.add_argument('--products', type=int, default=200)
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="action weights: usb, manual, edit, view")
+    parser.add_argument('--duration', type=float, help="soak: keep every session busy for this many seconds")
+    parser.add_argument('--sample', type=float, default=30, help="soak: seconds between memory samples")
+    parser.add_argument('--keep', action='store_true', help="keep the temporary data folder")
+    args = parser.parse_args()
+    run(args.sessions, args.actions, args.products, args.mix, args.duration, args.sample, args.keep)
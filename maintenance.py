@@ -0,0 +1,146 @@
+# ==============================================================================
+# COPYRIGHT NOTICE & LICENSE TERMS
+# ==============================================================================
+#  Software: QUANTIX Inventory System
+#  Owner:    Wildfire Consulting Services LLC
+#  Author:   Joao de Mendonca Salim
+#  Copyright (c) 2026 Wildfire Consulting Services LLC. All Rights Reserved.
+#
+#  LICENSE TERMS:
+#  This software is provided under a revocable, non-exclusive, non-transferable
+#  free license granted by Wildfire Consulting Services LLC.
+# ==============================================================================
+"""Maintenance work run as background jobs (see jobs.py).
+
+Every handler takes the progress callback first and only JSON parameters
+after it (paths included), so a job persisted by one session can be resumed
+by any other, whatever tenant that session is showing.
+"""
+
+import glob
+import os
+import uuid
+import zipfile
+from datetime import datetime
+
+import pandas as pd
+from PIL import Image
+
+import inventory_store
+import restore
+import sync
+
+try:
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+except ImportError:
+    pass
+
+BACKUP_FOLDER = 'backups'
+BACKUP_KEEP = 10
+INCOMING_FOLDER = '.incoming'  # raw uploads waiting for convert_image, inside the images folder
+IMAGE_EXTS = ['.png', '.jpg', '.jpeg']
+
+
+def _backups(root):
+    return sorted(glob.glob(os.path.join(root, BACKUP_FOLDER, "backup_*.zip")))
+
+
+def backup_due(root):
+    """inventory.csv changed since the newest backup (a cheap mtime check for every rerun)."""
+    data_file = os.path.join(root, 'inventory.csv')
+    if not os.path.exists(data_file): return False
+    existing = _backups(root)
+    return not existing or os.path.getmtime(data_file) > os.path.getmtime(existing[-1])
+
+
+def backup(progress, root, force=False, keep=BACKUP_KEEP):
+    """Zip the data files and images into backups/backup_<stamp>.zip, keeping the newest `keep`."""
+    if not force and not backup_due(root): return "up to date"
+    members = [f for f in restore.FILES if os.path.exists(os.path.join(root, f))]
+    for folder in restore.FOLDERS:
+        for dirpath, dirnames, files in os.walk(os.path.join(root, folder)):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+            members += [os.path.relpath(os.path.join(dirpath, f), root or '.') for f in files]
+    folder = os.path.join(root, BACKUP_FOLDER)
+    os.makedirs(folder, exist_ok=True)
+    name = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    tmp = os.path.join(folder, f".{name}.{uuid.uuid4().hex}.tmp")  # outside the backup_*.zip pattern until complete; unique per run
+    with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as z:
+        for i, m in enumerate(members):
+            if m == 'history.csv':  # appended to concurrently: copy a consistent prefix
+                with inventory_store.FileLock(os.path.join(root, m)): z.write(os.path.join(root, m), m)
+            else: z.write(os.path.join(root, m), m)
+            progress((i + 1) / max(len(members), 1), m)
+    os.replace(tmp, os.path.join(folder, name))
+    existing = _backups(root)
+    for old in existing[:-keep]: os.remove(old)
+    return name
+
+
+def latest_backup(root):
+    existing = _backups(root)
+    return existing[-1] if existing else None
+
+
+def incoming(img_folder, pid):
+    """Raw uploads for `pid` still waiting to be converted."""
+    return glob.glob(os.path.join(img_folder, INCOMING_FOLDER, f"{glob.escape(pid)}.*"))
+
+
+def save_upload(img_folder, pid, uploaded_file):
+    """Store an uploaded image as-is for convert_image; returns its path."""
+    folder = os.path.join(img_folder, INCOMING_FOLDER)
+    os.makedirs(folder, exist_ok=True)
+    ext = os.path.splitext(uploaded_file.name)[1].lower() or '.img'
+    path = os.path.join(folder, f"{pid}{ext}")
+    with open(path, "wb") as f: f.write(uploaded_file.getbuffer())
+    return path
+
+
+def convert_image(progress, src, dest):
+    """Convert any uploaded image (including HEIC/HEIF) to the PNG at `dest`, replacing other extensions."""
+    progress(0.1, os.path.basename(src))
+    tmp = dest + '.tmp'
+    with Image.open(src) as img: img.convert("RGB").save(tmp, "PNG")
+    os.replace(tmp, dest)
+    stem = os.path.splitext(dest)[0]
+    for old in glob.glob(glob.escape(stem) + ".*"):
+        if old != dest and os.path.splitext(old)[1].lower() in IMAGE_EXTS: os.remove(old)
+    os.remove(src)  # last: while it exists the product counts as waiting for its image
+    return os.path.basename(dest)
+
+
+def image_paths(df, img_folder, placeholder):
+    """image_path with missing files replaced by <id>.png/.jpg/.jpeg in `img_folder`, else the placeholder.
+
+    Products with an upload still being converted keep their path.
+    """
+    paths = df['image_path'].copy()
+    for i, pid, current in zip(df.index, df['product_id'], df['image_path']):
+        if pd.notna(current) and os.path.exists(str(current)): continue
+        if incoming(img_folder, pid): continue
+        paths[i] = next((p for p in (os.path.join(img_folder, f"{pid}{ext}") for ext in IMAGE_EXTS) if os.path.exists(p)), placeholder)
+    return paths
+
+
+def repair_inventory(progress, data_file, img_folder, placeholder):
+    """Write back the columns and image paths read_inventory/image_paths fill in on the fly."""
+    with inventory_store.FileLock(data_file):
+        df = inventory_store.read_inventory(data_file)
+        progress(0.5)
+        paths = image_paths(df, img_folder, placeholder)
+        fixed = int((paths.fillna('') != df['image_path'].fillna('')).sum())
+        if not fixed and not df.attrs['added_cols']: return "nothing to repair"
+        df['image_path'] = paths
+        inventory_store._replace_csv(df, data_file)
+    return f"{fixed} image paths, {len(df.attrs['added_cols'])} columns"
+
+
+def sync_stores(progress, root):
+    """Send this site's movements to the sync folder and apply the other sites' (see sync.py)."""
+    progress(0.1)
+    return sync.run(root)
+
+
+HANDLERS = {'backup': backup, 'image': convert_image, 'repair': repair_inventory, 'sync': sync_stores}
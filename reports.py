@@ -0,0 +1,111 @@
+# ==============================================================================
+# COPYRIGHT NOTICE & LICENSE TERMS
+# ==============================================================================
+#  Software: QUANTIX Inventory System
+#  Owner:    Wildfire Consulting Services LLC
+#  Author:   Joao de Mendonca Salim
+#  Copyright (c) 2026 Wildfire Consulting Services LLC. All Rights Reserved.
+#
+#  LICENSE TERMS:
+#  This software is provided under a revocable, non-exclusive, non-transferable
+#  free license granted by Wildfire Consulting Services LLC.
+# ==============================================================================
+"""Streaming XLSX/CSV reports: inventory valuation, sales and the movement log.
+
+history.csv is read in chunks and rows are written as they are produced
+(openpyxl write-only mode for XLSX), so memory stays flat however large the
+history is. Sales are valued at current catalog prices, like the dashboard.
+"""
+
+import csv
+import io
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pandas as pd
+from openpyxl import Workbook
+
+import inventory_store
+
+HISTORY_COLS = ['timestamp', 'product_id', 'product_name', 'action', 'amount', 'new_total']
+CHUNK_ROWS = 50000
+FORMATS = ('xlsx', 'csv')
+MIME = {'xlsx': "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", 'csv': "text/csv"}
+
+
+def period_range(days, now=None):
+    """(start, end) timestamps for the last `days` days, as in the dashboard's period selector."""
+    now = now or datetime.now()
+    start = (now - timedelta(days=days)).date() + timedelta(days=1)
+    return f"{start} 00:00:00", now.strftime("%Y-%m-%d 23:59:59")
+
+
+@contextmanager
+def _rows(out, fmt, title):
+    """Yield an append(row) callable writing to `out` (path or binary file) as XLSX or CSV."""
+    if fmt == 'xlsx':
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(title[:31])
+        yield ws.append
+        wb.save(out)
+    elif fmt == 'csv':
+        f = open(out, 'w', newline='', encoding='utf-8-sig') if isinstance(out, str) else io.TextIOWrapper(out, encoding='utf-8-sig', newline='')
+        try:
+            yield csv.writer(f).writerow
+        finally:
+            if isinstance(out, str): f.close()
+            else: f.flush(); f.detach()
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def _history_chunks(history_file, start=None, end=None, actions=None):
+    if not os.path.exists(history_file): return
+    for chunk in pd.read_csv(history_file, chunksize=CHUNK_ROWS, dtype={'product_id': str, 'timestamp': str}):
+        ts = chunk['timestamp'].fillna('')
+        mask = pd.Series(True, index=chunk.index)
+        if start: mask &= ts >= start
+        if end: mask &= ts <= end
+        if actions: mask &= chunk['action'].isin(actions)
+        chunk = chunk[mask]
+        if not chunk.empty: yield chunk
+
+
+def export_valuation(data_file, out, fmt='xlsx'):
+    inv = inventory_store.read_inventory(data_file)
+    with _rows(out, fmt, "Valuation") as append:
+        append(['product_id', 'product_name', 'quantity', 'cost_price', 'sell_price', 'stock_value', 'sales_value'])
+        tot_q = tot_c = tot_s = 0
+        for r in inv.itertuples(index=False):
+            c, s = r.quantity * r.cost_price, r.quantity * r.sell_price
+            tot_q += r.quantity; tot_c += c; tot_s += s
+            append([r.product_id, r.product_name, r.quantity, r.cost_price, r.sell_price, round(c, 2), round(s, 2)])
+        append(['TOTAL', '', tot_q, '', '', round(tot_c, 2), round(tot_s, 2)])
+
+
+def export_sales(data_file, history_file, out, start=None, end=None, by='product', fmt='xlsx'):
+    """SALE totals in [start, end] grouped by 'product', 'day' or 'month'."""
+    prices = inventory_store.read_inventory(data_file).drop_duplicates('product_id').set_index('product_id')
+    keys = {'product': lambda c: c['product_id'], 'day': lambda c: c['timestamp'].str[:10], 'month': lambda c: c['timestamp'].str[:7]}[by]
+    acc = None
+    for chunk in _history_chunks(history_file, start, end, actions=['SALE']):
+        chunk = chunk.assign(amount=pd.to_numeric(chunk['amount'], errors='coerce').fillna(0))
+        chunk['revenue'] = chunk['amount'] * chunk['product_id'].map(prices['sell_price']).fillna(0)
+        chunk['profit'] = chunk['revenue'] - chunk['amount'] * chunk['product_id'].map(prices['cost_price']).fillna(0)
+        part = chunk.groupby(keys(chunk))[['amount', 'revenue', 'profit']].sum()
+        acc = part if acc is None else acc.add(part, fill_value=0)
+    with _rows(out, fmt, f"Sales by {by}") as append:
+        append([by if by != 'product' else 'product_id'] + (['product_name'] if by == 'product' else []) + ['units', 'revenue', 'profit'])
+        if acc is not None:
+            for key, r in acc.sort_index().iterrows():
+                name = [prices['product_name'].get(key, '')] if by == 'product' else []
+                append([key] + name + [int(r['amount']), round(r['revenue'], 2), round(r['profit'], 2)])
+
+
+def export_movements(history_file, out, start=None, end=None, fmt='xlsx'):
+    with _rows(out, fmt, "Movements") as append:
+        append(HISTORY_COLS)
+        for chunk in _history_chunks(history_file, start, end):
+            rows = chunk[HISTORY_COLS].astype(object)
+            for row in rows.where(rows.notna(), None).itertuples(index=False, name=None): append(list(row))  # empty cells, not 'nan'
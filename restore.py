@@ -0,0 +1,172 @@
+# ==============================================================================
+# COPYRIGHT NOTICE & LICENSE TERMS
+# ==============================================================================
+#  Software: QUANTIX Inventory System
+#  Owner:    Wildfire Consulting Services LLC
+#  Author:   Joao de Mendonca Salim
+#  Copyright (c) 2026 Wildfire Consulting Services LLC. All Rights Reserved.
+#
+#  LICENSE TERMS:
+#  This software is provided under a revocable, non-exclusive, non-transferable
+#  free license granted by Wildfire Consulting Services LLC.
+# ==============================================================================
+"""Restore a data root from a backup_*.zip archive.
+
+The archive is validated first (member paths, CSV schemas, image references),
+then streamed into a staging folder next to the live data, and finally swapped
+in item by item with os.replace while the inventory lock is held. Only items
+present in the archive are replaced; derived data (checkpoints, the history
+offset index) is dropped so it gets rebuilt from the restored history. Legacy
+qr_codes/ and barcodes/ entries are ignored since those images are now
+rendered on demand.
+"""
+
+import glob
+import io
+import os
+import shutil
+import zipfile
+from datetime import datetime
+
+import pandas as pd
+
+import inventory_store
+
+FILES = ['inventory.csv', 'history.csv', 'config.json', 'logo.png', 'placeholder.png']
+FOLDERS = ['product_images']
+DERIVED = ['checkpoints', 'history.csv' + inventory_store.INDEX_SUFFIX]
+REQUIRED_INVENTORY_COLS = inventory_store.QTY_COLS + inventory_store.MONEY_COLS + ['product_id', 'product_name']
+
+
+def list_backups(folder):
+    """Newest first: dicts with path, name, size (bytes) and created (datetime)."""
+    out = []
+    for path in glob.glob(os.path.join(folder, "backup_*.zip")):
+        name = os.path.basename(path)
+        try:
+            size = os.path.getsize(path)
+            try: created = datetime.strptime(name[len("backup_"):-len(".zip")], "%Y%m%d_%H%M%S")
+            except ValueError: created = datetime.fromtimestamp(os.path.getmtime(path))
+        except OSError: continue  # trimmed by a backup job since the glob
+        out.append({'path': path, 'name': name, 'size': size, 'created': created})
+    return sorted(out, key=lambda b: b['created'], reverse=True)
+
+
+def _managed(name):
+    """Live-relative target of an archive member, or None if the member is not restored."""
+    name = name.replace('\\', '/')
+    if name in FILES: return name
+    top = name.split('/', 1)[0]
+    if top in FOLDERS and not name.endswith('/'): return name
+    return None
+
+
+def _image_ref(path, root):
+    """Archive member name an image_path refers to (paths are stored as <root>/product_images/...)."""
+    return os.path.relpath(path, root or '.').replace('\\', '/')
+
+
+def validate(zip_path, root=''):
+    """Return a list of problems; an empty list means the archive can be restored into `root`."""
+    errors = []
+    try: z = zipfile.ZipFile(zip_path)
+    except (zipfile.BadZipFile, OSError) as e: return [f"Not a readable zip archive: {e}"]
+    with z:
+        names = set()
+        for info in z.infolist():
+            n = info.filename.replace('\\', '/')
+            if n.startswith('/') or '..' in n.split('/') or ':' in n: errors.append(f"Unsafe path in archive: {info.filename}")
+            names.add(n)
+        if 'inventory.csv' not in names: return errors + ["inventory.csv is missing"]
+        try:
+            inv = pd.read_csv(io.BytesIO(z.read('inventory.csv')), dtype=inventory_store.INVENTORY_DTYPES)
+        except Exception as e:
+            return errors + [f"inventory.csv is not a valid CSV: {e}"]
+        missing = [c for c in REQUIRED_INVENTORY_COLS if c not in inv.columns]
+        if missing: errors.append(f"inventory.csv lacks columns: {', '.join(missing)}")
+        else: errors += [f"inventory.csv: {e}" for e in inventory_store.validate_inventory(inv)]
+        if 'image_path' in inv.columns:
+            refs = [_image_ref(p, root) for p in inv['image_path'].dropna().astype(str).str.replace('\\', '/', regex=False)]
+            dangling = sorted({r for r in refs if r.split('/', 1)[0] in FOLDERS and r not in names})
+            if dangling: errors.append(f"{len(dangling)} image(s) referenced by inventory.csv are not in the archive, e.g. {dangling[0]}")
+        if 'history.csv' in names:
+            with z.open('history.csv') as f:
+                header = f.readline().decode('utf-8', 'replace').strip().split(',')
+            if header != inventory_store.HISTORY_COLS: errors.append("history.csv header does not match the expected columns")
+    return errors
+
+
+def plan(zip_path, root):
+    """Dry run: what a restore of `zip_path` into `root` would change."""
+    with zipfile.ZipFile(zip_path) as z:
+        members = {m for m in (_managed(i.filename) for i in z.infolist()) if m}
+        backup_inv = inventory_store.apply_schema(pd.read_csv(io.BytesIO(z.read('inventory.csv')), dtype=inventory_store.INVENTORY_DTYPES))
+        backup_hist = sum(1 for _ in io.TextIOWrapper(z.open('history.csv'), encoding='utf-8')) - 1 if 'history.csv' in members else None
+    live = lambda rel: os.path.join(root, rel)
+    live_files = {f for f in FILES if os.path.exists(live(f))}
+    for folder in FOLDERS:
+        if any(m.startswith(folder + '/') for m in members):
+            for dirpath, _, files in os.walk(live(folder)):
+                live_files.update(os.path.relpath(os.path.join(dirpath, f), root or '.').replace('\\', '/') for f in files)
+    restored_folders = {m.split('/', 1)[0] for m in members if '/' in m}
+    report = {
+        'replaced': sorted(m for m in members if m in live_files),
+        'added': sorted(m for m in members if m not in live_files),
+        'removed': sorted(f for f in live_files if '/' in f and f.split('/', 1)[0] in restored_folders and f not in members),
+    }
+    live_inv = inventory_store.read_inventory(live('inventory.csv')) if os.path.exists(live('inventory.csv')) else pd.DataFrame(columns=['product_id', 'quantity'])
+    a = live_inv.set_index('product_id')['quantity']; b = backup_inv.set_index('product_id')['quantity']
+    common = a.index.intersection(b.index)
+    report['products'] = {
+        'added': int(len(b.index.difference(a.index))),
+        'removed': int(len(a.index.difference(b.index))),
+        'quantity_changed': int((a[common] != b[common]).sum()),
+    }
+    if backup_hist is not None:
+        live_hist = sum(1 for _ in open(live('history.csv'), encoding='utf-8')) - 1 if os.path.exists(live('history.csv')) else 0
+        report['history_rows'] = {'live': live_hist, 'backup': backup_hist}
+    return report
+
+
+def restore(zip_path, root, dry_run=False):
+    """Validate, stage and swap in `zip_path`. Returns plan(); raises ValueError if validation fails."""
+    errors = validate(zip_path, root)
+    if errors: raise ValueError("; ".join(errors))
+    report = plan(zip_path, root)
+    if dry_run: return report
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    staging = os.path.join(root, f".restore_staging_{stamp}")
+    old = os.path.join(root, f".restore_old_{stamp}")
+    os.makedirs(staging)
+    done = False
+    try:
+        with zipfile.ZipFile(zip_path) as z:
+            for info in z.infolist():
+                rel = _managed(info.filename)
+                if rel is None: continue
+                dest = os.path.join(staging, rel)
+                os.makedirs(os.path.dirname(dest) or staging, exist_ok=True)
+                with z.open(info) as src, open(dest, 'wb') as dst: shutil.copyfileobj(src, dst, 1024 * 1024)
+        items = [i for i in FILES + FOLDERS if os.path.exists(os.path.join(staging, i))]
+        os.makedirs(old)
+        with inventory_store.FileLock(os.path.join(root, 'inventory.csv')):
+            moved = []
+            try:
+                for item in items:
+                    if os.path.exists(os.path.join(root, item)):
+                        os.replace(os.path.join(root, item), os.path.join(old, item)); moved.append(item)
+                    os.replace(os.path.join(staging, item), os.path.join(root, item))
+            except OSError:
+                for item in moved:  # roll back what was already swapped
+                    if os.path.exists(os.path.join(root, item)): shutil.rmtree(os.path.join(root, item)) if os.path.isdir(os.path.join(root, item)) else os.remove(os.path.join(root, item))
+                    os.replace(os.path.join(old, item), os.path.join(root, item))
+                raise
+        for d in DERIVED:
+            d = os.path.join(root, d)
+            if os.path.isdir(d): shutil.rmtree(d, ignore_errors=True)
+            elif os.path.exists(d): os.remove(d)
+        done = True
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+        if done: shutil.rmtree(old, ignore_errors=True)  # otherwise keep the previous data for manual recovery
+    return report
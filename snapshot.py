@@ -0,0 +1,174 @@
+# ==============================================================================
+# COPYRIGHT NOTICE & LICENSE TERMS
+# ==============================================================================
+#  Software: QUANTIX Inventory System
+#  Owner:    Wildfire Consulting Services LLC
+#  Author:   Joao de Mendonca Salim
+#  Copyright (c) 2026 Wildfire Consulting Services LLC. All Rights Reserved.
+#
+#  LICENSE TERMS:
+#  This software is provided under a revocable, non-exclusive, non-transferable
+#  free license granted by Wildfire Consulting Services LLC.
+# ==============================================================================
+"""Read-only snapshots of a data root for the dashboard viewer.
+
+The publisher reads inventory.csv and the size of history.csv under the
+inventory lock (so both describe the same moment), folds the new history rows
+into daily sales per product, and writes a compact snapshot into snapshot/:
+
+    inventory_<stamp>.csv.gz   catalog + forecast columns + image thumbnails
+    sales_<stamp>.csv.gz       date, product_id, units (SALE rows only)
+    outflow_<stamp>.csv.gz     the forecast's SalesLedger events, so a restart resumes it
+    current.json               stamp, published_at, history offset/mark, ledger offset/mark, rows
+
+current.json is replaced last and atomically, so a viewer always sees a
+complete snapshot; the previous one is kept for viewers still reading it.
+Besides its offset, the publisher keeps the bytes just before it (the mark),
+so a history.csv replaced by a restore is folded again from the start even
+when it has already grown past the old offset.
+
+    python snapshot.py [--tenant ID] [--interval 60] [--once]
+"""
+
+import argparse
+import base64
+import glob
+import io
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+from PIL import Image
+
+import forecast
+import inventory_store
+import tenants
+
+SNAPSHOT_FOLDER = 'snapshot'
+CURRENT_FILE = 'current.json'
+THUMB_SIZE = (64, 64)
+
+
+def _files(stamp):
+    return {'inventory': f"inventory_{stamp}.csv.gz", 'sales': f"sales_{stamp}.csv.gz", 'outflow': f"outflow_{stamp}.csv.gz"}
+
+
+def _no_sales():
+    return pd.Series(dtype=float, name='units', index=pd.MultiIndex.from_arrays([[], []], names=['date', 'product_id']))
+
+
+def _thumb(path):
+    try:
+        with Image.open(path) as img:
+            img.thumbnail(THUMB_SIZE)
+            buf = io.BytesIO(); img.convert("RGBA").save(buf, "PNG")
+        return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode()
+    except (OSError, ValueError):
+        return None
+
+
+class Publisher:
+    """Keeps the daily sales aggregate and the history offset between publishes."""
+
+    def __init__(self, root):
+        self.root = root
+        self.data_file = os.path.join(root, 'inventory.csv')
+        self.history_file = os.path.join(root, 'history.csv')
+        self.folder = os.path.join(root, SNAPSHOT_FOLDER)
+        self.ledger = forecast.SalesLedger(self.history_file)
+        self._thumbs = {}
+        self._offset, self._mark, self._sales = 0, '', _no_sales()
+        meta = read_meta(self.folder)
+        if meta:  # resume from the last snapshot instead of re-reading the whole history
+            try:
+                prev = pd.read_csv(os.path.join(self.folder, meta['sales']), dtype={'date': str, 'product_id': str})
+                self._sales = prev.set_index(['date', 'product_id'])['units']
+                self._offset, self._mark = meta['history_offset'], meta['history_mark']
+                self.ledger.restore(os.path.join(self.folder, meta['outflow']), meta['ledger_offset'], meta['ledger_mark'])
+            except (OSError, KeyError, ValueError): pass
+
+    def _fold_history(self, size):
+        if size < self._offset or inventory_store.history_tail(self.history_file, self._offset) != self._mark:
+            self._offset, self._mark, self._sales = 0, '', _no_sales()  # history rewritten / restored
+        if size == self._offset: return
+        with open(self.history_file, 'rb') as f:
+            f.seek(self._offset); chunk = f.read(size - self._offset)
+        end = chunk.rfind(b'\n') + 1
+        if end == 0: return
+        rows = pd.read_csv(io.BytesIO(chunk[:end]), header=0 if self._offset == 0 else None, names=inventory_store.HISTORY_COLS, dtype={'timestamp': str, 'product_id': str})
+        self._offset += end
+        self._mark = inventory_store.history_tail(self.history_file, self._offset)
+        rows = rows[rows['action'] == 'SALE']
+        if rows.empty: return
+        part = pd.to_numeric(rows['amount'], errors='coerce').fillna(0).abs().groupby([rows['timestamp'].str[:10], rows['product_id']]).sum()
+        part.index.names = ['date', 'product_id']
+        self._sales = part if self._sales.empty else self._sales.add(part, fill_value=0)
+
+    def publish(self):
+        if not os.path.exists(self.data_file): return None
+        with inventory_store.FileLock(self.data_file):
+            inv = inventory_store.read_inventory(self.data_file)
+            size = os.path.getsize(self.history_file) if os.path.exists(self.history_file) else 0
+        self._fold_history(size)
+
+        fc = forecast.forecast(inv, self.ledger.refresh())
+        inv = pd.concat([inv, fc.drop(columns=['product_id'])], axis=1)
+        thumbs = {}
+        for p in inv['image_path'].dropna().astype(str).unique():
+            try: key = (p, os.path.getmtime(p))
+            except OSError: continue
+            thumbs[key] = self._thumbs[key] if key in self._thumbs else _thumb(p)
+        self._thumbs = thumbs
+        by_path = {p: uri for (p, _), uri in thumbs.items()}
+        inv['thumb'] = inv['image_path'].map(by_path)
+
+        os.makedirs(self.folder, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        meta = {'stamp': stamp, 'published_at': inventory_store.now_str(), 'history_offset': self._offset, 'history_mark': self._mark,
+                **_files(stamp), 'products': len(inv), 'sales_rows': len(self._sales)}
+        inv.to_csv(os.path.join(self.folder, meta['inventory']), index=False)
+        self._sales.rename('units').reset_index().to_csv(os.path.join(self.folder, meta['sales']), index=False)
+        meta['ledger_offset'], meta['ledger_mark'] = self.ledger.save(os.path.join(self.folder, meta['outflow']))
+        tmp = os.path.join(self.folder, CURRENT_FILE + '.tmp')
+        with open(tmp, 'w') as f: json.dump(meta, f)
+        prev = read_meta(self.folder)
+        os.replace(tmp, os.path.join(self.folder, CURRENT_FILE))
+        keep = set(_files(stamp).values()) | (set(_files(prev['stamp']).values()) if prev else set())
+        for old in glob.glob(os.path.join(self.folder, "*_*.csv.gz")):
+            if os.path.basename(old) not in keep: os.remove(old)
+        return meta
+
+
+def read_meta(folder):
+    try:
+        with open(os.path.join(folder, CURRENT_FILE), 'r') as f: return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load(folder, stamp):
+    """(inventory, sales) frames of the snapshot published as `stamp`."""
+    files = _files(stamp)
+    inv = inventory_store.apply_schema(pd.read_csv(os.path.join(folder, files['inventory']), dtype=inventory_store.INVENTORY_DTYPES, parse_dates=['stockout_date']))
+    sales = pd.read_csv(os.path.join(folder, files['sales']), dtype={'product_id': str}, parse_dates=['date'])
+    return inv, sales
+
+
+if __name__ == '__main__':
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="QUANTIX read-only snapshot publisher")
+    parser.add_argument('--tenant', default='', help="publish tenants/<id> instead of the install folder")
+    parser.add_argument('--interval', type=float, default=60, help="seconds between snapshots")
+    parser.add_argument('--once', action='store_true', help="publish one snapshot and exit")
+    args = parser.parse_args()
+    pub = Publisher(tenants.root(args.tenant.strip().lower()))
+    while True:
+        t0 = time.perf_counter()
+        meta = pub.publish()
+        if meta is None: print("No inventory.csv yet.", file=sys.stderr)
+        else: print(f"{meta['published_at']} snapshot {meta['stamp']}: {meta['products']} products, {meta['sales_rows']} sales rows ({time.perf_counter() - t0:.2f}s)")
+        if args.once: break
+        time.sleep(args.interval)
@@ -0,0 +1,229 @@
+# ==============================================================================
+# COPYRIGHT NOTICE & LICENSE TERMS
+# ==============================================================================
+#  Software: QUANTIX Inventory System
+#  Owner:    Wildfire Consulting Services LLC
+#  Author:   Joao de Mendonca Salim
+#  Copyright (c) 2026 Wildfire Consulting Services LLC. All Rights Reserved.
+#
+#  LICENSE TERMS:
+#  This software is provided under a revocable, non-exclusive, non-transferable
+#  free license granted by Wildfire Consulting Services LLC.
+# ==============================================================================
+"""Point-in-time stock, valuation and movement queries over history.csv.
+
+Every history row carries the product's `new_total`, so the stock of a SKU at
+any moment is the `new_total` of its last event up to that moment. To avoid
+scanning the whole file per query, update() writes a checkpoint (full quantity
+vector + byte offset into history.csv) at every period boundary; a query loads
+the nearest checkpoint before the target and replays only the rows after it.
+
+SKUs with no event before the target fall back to their opening stock (inferred
+from their first event), and SKUs that were never logged to their current
+inventory quantity.
+"""
+
+import io
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+HISTORY_COLS = ['timestamp', 'product_id', 'product_name', 'action', 'amount', 'new_total']
+SIGNED_ACTIONS = ('ADJUST', 'SYNC')  # amount is the signed change, as in inventory_store
+MOVEMENT_ACTIONS = ['ADD', 'REMOVE', 'SALE', *SIGNED_ACTIONS]  # columns of movement(): opening + ADD - REMOVE - SALE + ADJUST + SYNC = closing
+TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+BLOCK_SIZE = 1024 * 1024
+
+
+def _ts(when, end_of_day=False):
+    """Normalize a date/datetime/string to the history timestamp string (they sort lexically)."""
+    when = pd.Timestamp(when)
+    if end_of_day and when == when.normalize(): when += pd.Timedelta(hours=23, minutes=59, seconds=59)
+    return when.strftime(TS_FORMAT)
+
+
+def _iter_blocks(path, start):
+    """Yield (rows, row_start_offsets) for complete lines of `path` from byte `start`."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        pos, carry = start, b''
+        while True:
+            data = f.read(BLOCK_SIZE)
+            buf = carry + data
+            cut = buf.rfind(b'\n') + 1
+            if cut == 0:
+                if not data: return
+                carry = buf; continue
+            block, carry = buf[:cut], buf[cut:]
+            ends = pos + np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == 10) + 1
+            starts = np.concatenate([[pos], ends[:-1]])
+            rows = pd.read_csv(io.BytesIO(block), header=None, names=HISTORY_COLS, dtype={'timestamp': str, 'product_id': str, 'action': str}, skip_blank_lines=False)
+            rows['new_total'] = pd.to_numeric(rows['new_total'], errors='coerce')
+            rows['amount'] = pd.to_numeric(rows['amount'], errors='coerce').fillna(0)
+            yield rows, starts
+            pos += cut
+            if not data: return
+
+
+def _last_totals(rows):
+    rows = rows.dropna(subset=['product_id', 'new_total'])
+    return rows.groupby('product_id', sort=False)['new_total'].last()
+
+
+class StockHistory:
+    def __init__(self, history_file, folder, freq='MS'):
+        self.history_file = history_file
+        self.folder = folder
+        self.freq = freq
+        self._lock = threading.Lock()
+        self._vectors = {}
+        self._load()
+
+    # --- persistence ---
+    def _index_path(self): return os.path.join(self.folder, 'index.json')
+    def _opening_path(self): return os.path.join(self.folder, 'opening.csv')
+
+    def _load(self):
+        self.checkpoints, self.opening = [], pd.Series(dtype=float)
+        if os.path.exists(self._index_path()):
+            try:
+                with open(self._index_path(), 'r') as f: self.checkpoints = json.load(f)['checkpoints']
+                if os.path.exists(self._opening_path()):
+                    self.opening = pd.read_csv(self._opening_path(), dtype={'product_id': str}).set_index('product_id')['quantity']
+            except (ValueError, KeyError, OSError):
+                self.checkpoints, self.opening = [], pd.Series(dtype=float)
+
+    def _save(self):
+        os.makedirs(self.folder, exist_ok=True)
+        tmp = self._opening_path() + '.tmp'
+        self.opening.rename_axis('product_id').rename('quantity').to_csv(tmp); os.replace(tmp, self._opening_path())
+        tmp = self._index_path() + '.tmp'
+        with open(tmp, 'w') as f: json.dump({'checkpoints': self.checkpoints}, f)
+        os.replace(tmp, self._index_path())
+
+    def _write_vector(self, ts, offset, vector):
+        name = f"stock_{ts[:10].replace('-', '')}.csv"
+        vector.rename_axis('product_id').rename('quantity').to_csv(os.path.join(self.folder, name))
+        self._vectors[name] = vector.copy()
+        self.checkpoints.append({'ts': ts, 'offset': int(offset), 'file': name})
+
+    def _vector(self, cp):
+        if cp['file'] not in self._vectors:
+            self._vectors[cp['file']] = pd.read_csv(os.path.join(self.folder, cp['file']), dtype={'product_id': str}).set_index('product_id')['quantity']
+        return self._vectors[cp['file']]
+
+    def _header_end(self):
+        if not os.path.exists(self.history_file): return 0
+        with open(self.history_file, 'rb') as f: return len(f.readline())
+
+    def _base(self, ts):
+        """Latest checkpoint at or before `ts`: (vector, offset)."""
+        best = None
+        for cp in self.checkpoints:
+            if cp['ts'] <= ts: best = cp
+        if best is None: return pd.Series(dtype=float), self._header_end()
+        return self._vector(best).copy(), best['offset']
+
+    def _next_boundary(self, ts):
+        return (pd.Timestamp(ts[:10]) + pd.tseries.frequencies.to_offset(self.freq)).strftime(TS_FORMAT)
+
+    # --- maintenance ---
+    def update(self):
+        """Write checkpoints for every period boundary crossed since the last one."""
+        with self._lock:
+            if not os.path.exists(self.history_file): return
+            if self.checkpoints and os.path.getsize(self.history_file) < self.checkpoints[-1]['offset']: self._clear()
+            self._update()
+
+    def rebuild(self):
+        """Drop all checkpoints (e.g. after history.csv was replaced) and rescan."""
+        with self._lock:
+            self._clear()
+            if os.path.exists(self.history_file): self._update()
+
+    def _clear(self):
+        for cp in self.checkpoints:
+            try: os.remove(os.path.join(self.folder, cp['file']))
+            except OSError: pass
+        self.checkpoints, self.opening, self._vectors = [], pd.Series(dtype=float), {}
+
+    def _update(self):
+        if self.checkpoints:
+            vector, offset = self._vector(self.checkpoints[-1]).copy(), self.checkpoints[-1]['offset']
+            boundary = self._next_boundary(self.checkpoints[-1]['ts'])
+        else:
+            vector, offset, boundary = pd.Series(dtype=float), self._header_end(), None
+        os.makedirs(self.folder, exist_ok=True)
+        for rows, starts in _iter_blocks(self.history_file, offset):
+            ts = rows['timestamp'].fillna('').to_numpy(str)
+            if boundary is None and (ts != '').any(): boundary = self._next_boundary(ts[ts != ''][0])
+            self._learn_opening(rows)
+            start = 0
+            while boundary is not None:
+                hit = np.flatnonzero(ts[start:] >= boundary)
+                if not len(hit): break
+                i = start + hit[0]
+                vector = _last_totals(rows.iloc[start:i]).combine_first(vector) if i > start else vector
+                self._write_vector(boundary, starts[i], vector)
+                start, boundary = i, self._next_boundary(ts[i])
+            if start < len(rows): vector = _last_totals(rows.iloc[start:]).combine_first(vector)
+        self._save()
+
+    def _learn_opening(self, rows):
+        new = rows[~rows['product_id'].isin(self.opening.index)].dropna(subset=['product_id', 'new_total']).drop_duplicates('product_id')
+        if new.empty: return
+        sign = np.select([new['action'].isin(['ADD', *SIGNED_ACTIONS]), new['action'].isin(['SALE', 'REMOVE'])], [-1, 1], 0)
+        self.opening = pd.concat([self.opening, pd.Series((new['new_total'] + sign * new['amount']).to_numpy(), index=new['product_id'].to_numpy())])
+
+    # --- queries ---
+    def _replay(self, until, since=None):
+        """Stock vector at `until` and, if `since` is given, the vector just before `since` plus per-action sums in between."""
+        vector, offset = self._base(since or until)
+        before, sums = None, []
+        if os.path.exists(self.history_file):
+            for rows, _ in _iter_blocks(self.history_file, offset):
+                ts = rows['timestamp'].fillna('')
+                if since is not None:
+                    pre = rows[ts < since]
+                    if not pre.empty: vector = _last_totals(pre).combine_first(vector)
+                    rows, ts = rows[ts >= since], ts[ts >= since]
+                    if before is None and len(rows): before = vector.copy()
+                inside = rows[ts <= until]
+                if not inside.empty:
+                    vector = _last_totals(inside).combine_first(vector)
+                    if since is not None: sums.append(inside.groupby(['product_id', 'action'])['amount'].sum())
+                if len(ts) and (ts > until).all(): break
+        if since is None: return vector
+        if before is None: before = vector.copy()
+        sums = pd.concat(sums).groupby(level=[0, 1]).sum().unstack(fill_value=0) if sums else pd.DataFrame()
+        return before, vector, sums
+
+    def _align(self, vector, inventory):
+        ids = inventory['product_id'].astype(str)
+        current = pd.Series(pd.to_numeric(inventory['quantity'], errors='coerce').fillna(0).to_numpy(), index=ids.to_numpy())
+        return vector.reindex(ids).fillna(self.opening.reindex(ids)).fillna(current).fillna(0).to_numpy()
+
+    def stock_at(self, when, inventory):
+        """Quantity of every catalog SKU at the end of `when` (date) or at `when` (datetime)."""
+        qty = self._align(self._replay(_ts(when, end_of_day=True)), inventory)
+        return pd.DataFrame({'product_id': inventory['product_id'].astype(str).to_numpy(), 'product_name': inventory['product_name'].to_numpy(), 'quantity': qty.astype(int)})
+
+    def valuation_at(self, when, inventory):
+        """stock_at() priced at the catalog's current cost/sell prices."""
+        out = self.stock_at(when, inventory)
+        out['stock_value'] = out['quantity'] * pd.to_numeric(inventory['cost_price'], errors='coerce').fillna(0).to_numpy()
+        out['sales_value'] = out['quantity'] * pd.to_numeric(inventory['sell_price'], errors='coerce').fillna(0).to_numpy()
+        return out
+
+    def movement(self, start, end, inventory):
+        """Opening stock, per-action movement and closing stock between two dates (inclusive)."""
+        before, after, sums = self._replay(_ts(end, end_of_day=True), since=_ts(start))
+        ids = inventory['product_id'].astype(str)
+        out = pd.DataFrame({'product_id': ids.to_numpy(), 'product_name': inventory['product_name'].to_numpy(), 'opening': self._align(before, inventory).astype(int)})
+        for action in MOVEMENT_ACTIONS:
+            out[action] = (sums[action].reindex(ids).fillna(0).to_numpy() if action in sums else np.zeros(len(out))).astype(int)
+        out['closing'] = self._align(after, inventory).astype(int)
+        return out
@@ -0,0 +1,246 @@
+# ==============================================================================
+# COPYRIGHT NOTICE & LICENSE TERMS
+# ==============================================================================
+#  Software: QUANTIX Inventory System
+#  Owner:    Wildfire Consulting Services LLC
+#  Author:   Joao de Mendonca Salim
+#  Copyright (c) 2026 Wildfire Consulting Services LLC. All Rights Reserved.
+#
+#  LICENSE TERMS:
+#  This software is provided under a revocable, non-exclusive, non-transferable
+#  free license granted by Wildfire Consulting Services LLC.
+# ==============================================================================
+"""Delta sync of stock movements between installations (shops, stockroom).
+
+Every site exports the movements it recorded in history.csv since its
+watermark as net quantity changes per product, one small file per export:
+
+    <share>/<site>_<seq>.json.gz   {"site", "seq", "created", "rows", "changes": {product_id: change}}
+
+and imports the other sites' files in sequence order, adding their changes to
+its own stock; each file is applied exactly once (sync.json keeps the last
+applied seq per site).
+
+Every local row exports the change it logged; a sale or removal clamped at
+zero exports only what was there (at most the product's previous total).
+Stock never goes below zero: an import that would take it there keeps the
+shortfall in sync.json and takes it from later additions. Additions commute,
+so once every site has applied every file all sites hold the same
+quantities, whatever order the files arrived in, apart from quantity edits.
+
+Imported changes are logged as SYNC rows, which are never exported again.
+Catalog rows are not synced: create a
+product with the same id at every site. Changes for products missing here
+are kept in sync.json and applied once the product exists. Quantity edits
+made in the catalog table or the edit form log no history row, so they are
+not movements and stay local.
+
+The share is any folder every site can reach (network drive, synced folder,
+USB stick):
+
+    python sync.py init --site shop1 --share /mnt/quantix_sync [--tenant ID]
+    python sync.py run [--tenant ID]          # export, then import
+    python sync.py status [--tenant ID]
+"""
+
+import argparse
+import glob
+import gzip
+import io
+import json
+import os
+import re
+import sys
+
+import pandas as pd
+
+import inventory_store
+import tenants
+
+STATE_FILE = 'sync.json'
+SYNC_ACTION = 'SYNC'
+_SITE_ID = re.compile(r'^[a-z0-9][a-z0-9-]{0,39}$')  # no '_': it separates site and seq in file names
+
+
+def _state_file(root): return os.path.join(root, STATE_FILE)
+
+
+def _delta_file(share, site, seq): return os.path.join(share, f"{site}_{seq:08d}.json.gz")
+
+
+def read_state(root):
+    try:
+        with open(_state_file(root), 'r', encoding='utf-8') as f: return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_state(root, state):
+    tmp = _state_file(root) + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f: json.dump(state, f)
+    os.replace(tmp, _state_file(root))
+
+
+def _history_size(history_file):
+    return os.path.getsize(history_file) if os.path.exists(history_file) else 0
+
+
+def init(root, site, share):
+    """Start syncing from now: the watermark is the current end of history.csv.
+
+    Sites should start from the same stock (e.g. the same backup restored everywhere).
+    """
+    if not _SITE_ID.match(site): raise ValueError(f"Invalid site id: {site!r}")
+    data_file = os.path.join(root, 'inventory.csv')
+    with inventory_store.FileLock(data_file):  # stock and history offset describe the same moment
+        inv = inventory_store.read_inventory(data_file)
+        offset = _history_size(os.path.join(root, 'history.csv'))
+    os.makedirs(share, exist_ok=True)
+    state = {'site': site, 'share': os.path.abspath(share), 'seq': 0, 'offset': offset, 'totals': dict(zip(inv['product_id'], inv['quantity'].tolist())),
+             'mark': inventory_store.history_tail(os.path.join(root, 'history.csv'), offset), 'applied': {}, 'pending': {}, 'deficit': {}, 'skipped': 0, 'last_sync': None}
+    with inventory_store.FileLock(_state_file(root)): _save_state(root, state)
+    return state
+
+
+def _local_changes(rows, totals):
+    """Net change per product of the locally recorded rows; updates `totals` to the last new_total.
+
+    A row's change is its logged amount (signed by action), so quantity edits
+    that logged no row never sync. An outflow that left the product at zero
+    took at most the previous logged total.
+    """
+    amount = pd.to_numeric(rows['amount'], errors='coerce')
+    total = pd.to_numeric(rows['new_total'], errors='coerce')
+    sign = rows['action'].map({**inventory_store.ACTION_SIGN, **{a: 1 for a in inventory_store.SIGNED_ACTIONS}})
+    delta = sign * amount
+    prev = total.groupby(rows['product_id']).shift(1).fillna(rows['product_id'].map(totals))
+    clamped = (delta < 0) & (total == 0) & prev.notna()
+    delta = delta.where(~clamped, delta.clip(lower=-prev))
+    local = (rows['action'] != SYNC_ACTION) & delta.notna()
+    changes = delta[local].groupby(rows['product_id'][local]).sum()
+    totals.update({pid: int(v) for pid, v in total.groupby(rows['product_id']).last().dropna().items()})
+    return {pid: int(c) for pid, c in changes.items() if c}, int(((rows['action'] != SYNC_ACTION) & delta.isna()).sum())
+
+
+def export(root):
+    """Write the local movements since the watermark to the share; returns the file name or None."""
+    history_file = os.path.join(root, 'history.csv')
+    with inventory_store.FileLock(_state_file(root)):
+        state = read_state(root)
+        if state is None: raise ValueError("Sync is not set up here (python sync.py init)")
+        size = _history_size(history_file)
+        if inventory_store.history_tail(history_file, state['offset']) != state.get('mark', ''):  # history replaced (restore): start again from its end
+            data_file = os.path.join(root, 'inventory.csv')
+            with inventory_store.FileLock(data_file):
+                inv = inventory_store.read_inventory(data_file)
+                size = _history_size(history_file)
+            state['offset'], state['totals'] = size, dict(zip(inv['product_id'], inv['quantity'].tolist()))
+        chunk = b''
+        if size > state['offset']:
+            with open(history_file, 'rb') as f:
+                f.seek(state['offset']); chunk = f.read(size - state['offset'])
+        end = chunk.rfind(b'\n') + 1
+        name = None
+        if end:
+            rows = pd.read_csv(io.BytesIO(chunk[:end]), header=0 if state['offset'] == 0 else None, names=inventory_store.HISTORY_COLS, dtype={'product_id': str, 'action': str, 'timestamp': str})
+            rows = rows.dropna(subset=['product_id'])
+            changes, skipped = _local_changes(rows, state['totals'])
+            state['skipped'] += skipped
+            if changes:
+                seq = state['seq'] + 1
+                path = _delta_file(state['share'], state['site'], seq)
+                tmp = path + '.tmp'
+                with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+                    json.dump({'site': state['site'], 'seq': seq, 'created': inventory_store.now_str(), 'rows': int((rows['action'] != SYNC_ACTION).sum()), 'changes': changes}, f)
+                os.replace(tmp, path)
+                state['seq'], name = seq, os.path.basename(path)
+            state['offset'] += end
+        state['mark'] = inventory_store.history_tail(history_file, state['offset'])
+        _save_state(root, state)
+    return name
+
+
+def _ready(share, site, applied):
+    """Delta files of other sites that are next in their sequence, as (site, seq, path)."""
+    found = {}
+    for path in glob.glob(os.path.join(share, "*_*.json.gz")):
+        other, _, seq = os.path.basename(path)[:-len('.json.gz')].rpartition('_')
+        if other != site and seq.isdigit(): found[(other, int(seq))] = path
+    ready = []
+    for other in sorted({s for s, _ in found}):
+        seq = applied.get(other, 0) + 1
+        while (other, seq) in found:
+            ready.append((other, seq, found[(other, seq)])); seq += 1
+    return ready
+
+
+def import_deltas(root):
+    """Apply the other sites' new delta files in one inventory write; returns (files applied, products changed)."""
+    data_file = os.path.join(root, 'inventory.csv')
+    with inventory_store.FileLock(_state_file(root)):
+        state = read_state(root)
+        if state is None: raise ValueError("Sync is not set up here (python sync.py init)")
+        ready = _ready(state['share'], state['site'], state['applied'])
+        changes, deficit = dict(state['pending']), state.get('deficit', {})
+        for pid, short in deficit.items(): changes[pid] = changes.get(pid, 0) - short
+        for _, _, path in ready:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                for pid, c in json.load(f)['changes'].items(): changes[pid] = changes.get(pid, 0) + int(c)
+        with inventory_store.FileLock(data_file):
+            df = inventory_store.read_inventory(data_file)
+            pos = {pid: i for i, pid in enumerate(df['product_id'])}
+            qty = df['quantity'].to_numpy(dtype='int64')
+            records, pending, deficit = [], {}, {}
+            for pid, change in changes.items():
+                i = pos.get(pid)
+                if i is None: pending[pid] = change; continue
+                new = qty[i] + change
+                if new < 0: deficit[pid], new = int(-new), 0  # never below zero; the rest comes off later additions
+                if new == qty[i]: continue
+                records.append((pid, df.at[i, 'product_name'], int(new - qty[i]), int(new), SYNC_ACTION))
+                qty[i] = new
+            if records:
+                df['quantity'] = qty.astype('int32')
+                df.loc[[pos[r[0]] for r in records], 'last_updated'] = pd.Timestamp(inventory_store.now_str())
+                inventory_store._replace_csv(df, data_file)
+                inventory_store.log_trans_many(os.path.join(root, 'history.csv'), records)
+            # Saved under the inventory lock, right after the write, so a file is not applied twice
+            for other, seq, _ in ready: state['applied'][other] = seq
+            state['pending'], state['deficit'], state['last_sync'] = pending, deficit, inventory_store.now_str()
+            _save_state(root, state)
+    return len(ready), len(records)
+
+
+def run(root):
+    """Export, then import; returns a one-line summary."""
+    name = export(root)
+    files, products = import_deltas(root)
+    state = read_state(root)
+    return f"sent {name or 'nothing'}, applied {files} files ({products} products), {len(state['pending'])} pending"
+
+
+def status(root):
+    state = read_state(root)
+    if state is None: return "Sync is not set up here."
+    return (f"site {state['site']} · share {state['share']} · exported seq {state['seq']} · last sync {state['last_sync']}\n"
+            f"applied: {', '.join(f'{s} #{n}' for s, n in sorted(state['applied'].items())) or '-'} · "
+            f"pending products: {len(state['pending'])} · short of stock: {len(state.get('deficit', {}))} · rows not exported (unknown action or amount): {state['skipped']}")
+
+
+if __name__ == '__main__':
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="QUANTIX multi-store delta sync")
+    parser.add_argument('command', choices=['init', 'run', 'status'])
+    parser.add_argument('--tenant', default='', help="sync tenants/<id> instead of the install folder")
+    parser.add_argument('--site', help="init: id of this installation (a-z, 0-9, '-')")
+    parser.add_argument('--share', help="init: folder shared by every site")
+    args = parser.parse_args()
+    root = tenants.root(args.tenant.strip().lower())
+    try:
+        if args.command == 'init':
+            if not args.site or not args.share: parser.error("init needs --site and --share")
+            init(root, args.site.strip().lower(), args.share); print(status(root))
+        elif args.command == 'run': print(run(root))
+        else: print(status(root))
+    except ValueError as e:
+        print(e, file=sys.stderr); sys.exit(1)
@@ -0,0 +1,110 @@
+# ==============================================================================
+# COPYRIGHT NOTICE & LICENSE TERMS
+# ==============================================================================
+#  Software: QUANTIX Inventory System
+#  Owner:    Wildfire Consulting Services LLC
+#  Author:   Joao de Mendonca Salim
+#  Copyright (c) 2026 Wildfire Consulting Services LLC. All Rights Reserved.
+#
+#  LICENSE TERMS:
+#  This software is provided under a revocable, non-exclusive, non-transferable
+#  free license granted by Wildfire Consulting Services LLC.
+# ==============================================================================
+"""Tenant data roots: one folder per company under tenants/.
+
+The empty tenant id is the install folder itself, so single-shop setups keep
+working unchanged. Each tenant folder holds its own config.json (company name,
+license), logo, inventory, history and images, plus access.json with the
+salted PBKDF2 hash of its password. A named tenant cannot be opened without
+its password; the install folder only asks for one once it has been given one.
+
+    python tenants.py list
+    python tenants.py create <tenant_id>        # asks for the password
+    python tenants.py passwd <tenant_id>        # '' for the install folder
+"""
+
+import getpass
+import hashlib
+import hmac
+import json
+import os
+import re
+import sys
+
+TENANTS_FOLDER = 'tenants'
+_TENANT_ID = re.compile(r'^[a-z0-9][a-z0-9_-]{0,39}$')
+ACCESS_FILE = 'access.json'
+PBKDF2_ITERATIONS = 200000
+
+
+def valid(tenant):
+    return tenant == '' or bool(_TENANT_ID.match(tenant))
+
+
+def root(tenant):
+    """Data root for `tenant` ('' for the install folder)."""
+    if not valid(tenant): raise ValueError(f"Invalid tenant id: {tenant!r}")
+    return os.path.join(TENANTS_FOLDER, tenant) if tenant else ''
+
+
+def exists(tenant):
+    return valid(tenant) and (tenant == '' or os.path.isdir(root(tenant)))
+
+
+def list_tenants():
+    if not os.path.isdir(TENANTS_FOLDER): return []
+    return sorted(d for d in os.listdir(TENANTS_FOLDER) if valid(d) and os.path.isdir(os.path.join(TENANTS_FOLDER, d)))
+
+
+def _digest(password, salt, iterations):
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations).hex()
+
+
+def set_password(tenant, password):
+    if not password: raise ValueError("Empty password")
+    salt = os.urandom(16)
+    path = os.path.join(root(tenant), ACCESS_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump({'salt': salt.hex(), 'iterations': PBKDF2_ITERATIONS, 'hash': _digest(password, salt, PBKDF2_ITERATIONS)}, f)
+    os.replace(path + '.tmp', path)
+
+
+def needs_password(tenant):
+    """Named tenants always do (without access.json nobody gets in); the install folder once it has one."""
+    return tenant != '' or os.path.exists(os.path.join(root(''), ACCESS_FILE))
+
+
+def check_password(tenant, password):
+    if not exists(tenant): return False
+    try:
+        with open(os.path.join(root(tenant), ACCESS_FILE), 'r') as f: access = json.load(f)
+        expected = _digest(password or '', bytes.fromhex(access['salt']), int(access['iterations']))
+        return hmac.compare_digest(expected, access['hash'])
+    except (OSError, ValueError, KeyError):
+        return False
+
+
+def create(tenant, password):
+    if not tenant or not valid(tenant): raise ValueError(f"Invalid tenant id: {tenant!r}")
+    os.makedirs(root(tenant), exist_ok=True)
+    set_password(tenant, password)
+    return root(tenant)
+
+
+def _ask_password():
+    password = getpass.getpass("Password: ")
+    if password != getpass.getpass("Repeat password: "): print("Passwords do not match."); sys.exit(1)
+    return password
+
+
+if __name__ == '__main__':
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    cmd = sys.argv[1] if len(sys.argv) > 1 else 'list'
+    if cmd == 'list':
+        for name in list_tenants(): print(name)
+    elif cmd == 'create' and len(sys.argv) == 3:
+        print(f"Created {create(sys.argv[2].strip().lower(), _ask_password())} - open http://<server>:8501/?tenant={sys.argv[2].strip().lower()} to activate it.")
+    elif cmd == 'passwd' and len(sys.argv) == 3 and exists(sys.argv[2].strip().lower()):
+        set_password(sys.argv[2].strip().lower(), _ask_password()); print("Password changed.")
+    else:
+        print(__doc__); sys.exit(1)
@@ -0,0 +1,67 @@
+import os
+
+import pandas as pd
+
+import inventory_store
+import sync
+
+
+def make_site(tmp_path, site, stock):
+    root = tmp_path / site
+    root.mkdir()
+    pd.DataFrame({'product_id': list(stock), 'product_name': [p.lower() for p in stock], 'quantity': list(stock.values()), 'min_stock': 1,
+                  'cost_price': 1.0, 'sell_price': 2.0, 'last_updated': inventory_store.now_str(), 'image_path': None}).to_csv(root / 'inventory.csv', index=False)
+    sync.init(str(root), site, str(tmp_path / 'share'))
+    return str(root)
+
+
+def move(root, *movements):
+    return inventory_store.apply_movements(os.path.join(root, 'inventory.csv'), os.path.join(root, 'history.csv'), movements)
+
+
+def stock(root):
+    return inventory_store.read_inventory(os.path.join(root, 'inventory.csv')).set_index('product_id')['quantity'].to_dict()
+
+
+def sync_all(*roots):
+    for _ in range(2):  # every site exports, then every site has seen every file
+        for root in roots: sync.run(root)
+
+
+def test_round_trip(tmp_path):
+    a, b = make_site(tmp_path, 'shop1', {'A': 10, 'B': 5}), make_site(tmp_path, 'shop2', {'A': 10, 'B': 5})
+    move(a, ('A', 'SALE', 3))
+    move(b, ('B', 'ADD', 2), ('A', 'REMOVE', 1))
+    sync_all(a, b)
+    assert stock(a) == stock(b) == {'A': 6, 'B': 7}
+    history = inventory_store.read_history(os.path.join(b, 'history.csv'))
+    assert history.loc[history['action'] == sync.SYNC_ACTION, 'amount'].tolist() == [-3]
+
+
+def test_files_apply_once(tmp_path):
+    a, b = make_site(tmp_path, 'shop1', {'A': 10}), make_site(tmp_path, 'shop2', {'A': 10})
+    move(a, ('A', 'SALE', 4))
+    sync_all(a, b)
+    sync_all(a, b)
+    assert stock(a) == stock(b) == {'A': 6}
+    assert sync.read_state(b)['applied'] == {'shop1': 1}
+
+
+def test_unlogged_edit_stays_local(tmp_path):
+    a, b = make_site(tmp_path, 'shop1', {'A': 10}), make_site(tmp_path, 'shop2', {'A': 10})
+    inventory_store.apply_edits(os.path.join(a, 'inventory.csv'), {'A': {'quantity': 50}})  # catalog edit: no history row
+    move(a, ('A', 'SALE', 1))
+    sync_all(a, b)
+    assert stock(a) == {'A': 49}
+    assert stock(b) == {'A': 9}
+
+
+def test_clamped_sales_converge(tmp_path):
+    a, b = make_site(tmp_path, 'shop1', {'A': 2}), make_site(tmp_path, 'shop2', {'A': 2})
+    move(a, ('A', 'SALE', 5))  # only 2 there
+    move(b, ('A', 'SALE', 1))
+    sync_all(a, b)
+    assert stock(a) == stock(b) == {'A': 0}
+    move(a, ('A', 'ADD', 4))
+    sync_all(a, b)
+    assert stock(a) == stock(b) == {'A': 3}  # shop2's own sale of 1 comes off the addition